@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for Birthday parsing.
+
+Compares the per-record cost of the old strptime-based validation with the
+hand-written parser used by Birthday, on a synthetic list of dates.
+
+Usage:
+    python benchmarks/birthday_parse.py [count]
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "my_contacts_book", "my_contacts_book"))
+
+from birthday import Birthday, parse_birthday  # noqa: E402
+
+
+def make_dates(count: int) -> list[str]:
+    """
+    Generates random DD.MM.YYYY strings.
+
+    Args:
+        count (int): The number of dates to generate.
+
+    Returns:
+        list[str]: The generated dates.
+    """
+    rng = random.Random(42)
+    return [f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1940, 2010)}" for _ in range(count)]
+
+
+def strptime_parse(values: list[str]) -> None:
+    for value in values:
+        datetime.strptime(value, "%d.%m.%Y")
+
+
+def fast_parse(values: list[str]) -> None:
+    parse = parse_birthday.__wrapped__
+    for value in values:
+        parse(value)
+
+
+def cached_parse(values: list[str]) -> None:
+    for value in values:
+        parse_birthday(value)
+
+
+def birthday_init(values: list[str]) -> None:
+    for value in values:
+        Birthday(value)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    values = make_dates(count)
+    cases = [
+        ("strptime", strptime_parse),
+        ("fast parser", fast_parse),
+        ("fast parser, cached", cached_parse),
+        ("Birthday()", birthday_init),
+    ]
+    for label, func in cases:
+        seconds = min(timeit.repeat(lambda: func(values), number=1, repeat=3))
+        print(f"{label:<24}{seconds / count * 1e9:10.1f} ns/record")
+
+
+if __name__ == "__main__":
+    main()
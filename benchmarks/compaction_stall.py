@@ -0,0 +1,107 @@
+"""
+Benchmark for edit latency while the journal is compacted.
+
+Builds a synthetic book, starts a background compaction and times single
+edits on the main thread until the snapshot is written: with the default
+collector, with the collector disabled and after gc.freeze(). It also counts
+the full collections during the compaction and times the longest one; they
+walk every container object that is not frozen, including the state tuples
+the pickler keeps in its memo until the snapshot is written.
+
+Usage:
+    python benchmarks/compaction_stall.py [count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "my_contacts_book", "my_contacts_book"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from handlers import add_contact  # noqa: E402
+from journal import Journal  # noqa: E402
+from suite import make_book, percentile  # noqa: E402
+
+# One compaction interval of the default journal.
+EDITS = 10000
+
+
+def edit_during_compaction(book, workdir: str, prefix: str, edits: int) -> dict:
+    """
+    Times edits on the main thread while a compaction writes the snapshot.
+
+    Args:
+        book (AddressBook): The book to edit.
+        workdir (str): A directory for the snapshot and journal.
+        prefix (str): A prefix for the added names, unique per run.
+        edits (int): The most edits to make before waiting for the snapshot.
+
+    Returns:
+        dict: The number of edits, p50/p99/max latency in microseconds,
+        the compaction time in seconds, and the number and longest pause of
+        the full collections.
+    """
+    journal = Journal(book, os.path.join(workdir, f"{prefix}.pkl"))
+    pauses = []
+    collecting = {}
+
+    def track(phase: str, info: dict) -> None:
+        if info["generation"] == 2:
+            if phase == "start":
+                collecting["started"] = time.perf_counter()
+            else:
+                pauses.append(time.perf_counter() - collecting["started"])
+
+    gc.callbacks.append(track)
+    samples = []
+    started = time.perf_counter()
+    journal.compact()
+    for i in range(edits):
+        if not journal._compacting():
+            break
+        begin = time.perf_counter()
+        add_contact([f"{prefix}{i}", f"0{i:09d}"], book)
+        samples.append(time.perf_counter() - begin)
+    journal._compaction.join()
+    elapsed = time.perf_counter() - started
+    gc.callbacks.remove(track)
+    journal.close()
+    samples.sort()
+    return {
+        "edits": len(samples),
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "max_us": samples[-1] * 1e6 if samples else 0.0,
+        "seconds": elapsed,
+        "full_collections": len(pauses),
+        "longest_collection_ms": max(pauses, default=0.0) * 1e3,
+    }
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{count} contacts")
+    with tempfile.TemporaryDirectory() as workdir:
+        for label in ("tracked", "disabled", "frozen"):
+            book = make_book(count)
+            if label == "disabled":
+                gc.disable()
+            elif label == "frozen":
+                gc.freeze()
+            started = time.perf_counter()
+            gc.collect()
+            collect_ms = (time.perf_counter() - started) * 1e3
+            result = edit_during_compaction(book, workdir, label, EDITS)
+            print(f"{label:<9} {result['edits']:>6} edits in {result['seconds']:.2f} s  "
+                  f"p50 {result['p50_us']:>6.1f} us  p99 {result['p99_us']:>6.1f} us  "
+                  f"max {result['max_us'] / 1000:>6.1f} ms  {result['full_collections']} full collections, "
+                  f"longest {result['longest_collection_ms']:.1f} ms; gc.collect() {collect_ms:.1f} ms")
+            gc.enable()
+            gc.unfreeze()
+            del book
+            gc.collect()
+
+if __name__ == "__main__":
+    main()
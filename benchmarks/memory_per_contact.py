@@ -0,0 +1,97 @@
+"""
+Memory benchmark for the record model.
+
+Builds the same synthetic contacts with a copy of the previous dict-based
+field classes and with the current slotted ones, and reports traced bytes
+per contact and pickle bytes per contact for both.
+
+Usage:
+    python benchmarks/memory_per_contact.py [count]
+"""
+import os
+import pickle
+import random
+import sys
+import tracemalloc
+from datetime import date
+from typing import Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "my_contacts_book", "my_contacts_book"))
+
+from record import Record  # noqa: E402
+
+
+class LegacyField:
+    def __init__(self, value):
+        self.value = value
+
+
+class LegacyRecord:
+    def __init__(self, name: str):
+        self.name = LegacyField(name)
+        self.phones = []
+        self.birthday = None
+
+
+def make_contacts(count: int) -> Iterator[tuple[str, list[str], str]]:
+    """
+    Generates synthetic contacts with one to three phones and a birthday.
+
+    The strings are created lazily, so they are counted for whichever model
+    keeps them alive.
+
+    Args:
+        count (int): The number of contacts.
+
+    Yields:
+        tuple[str, list[str], str]: A name, its phones and a DD.MM.YYYY birthday.
+    """
+    rng = random.Random(42)
+    first, last = date(1940, 1, 1).toordinal(), date(2010, 12, 31).toordinal()
+    for i in range(count):
+        phones = [f"0{rng.randrange(10 ** 9):09d}" for _ in range(rng.randint(1, 3))]
+        birthday = date.fromordinal(rng.randint(first, last))
+        yield f"Contact{i}", phones, birthday.strftime("%d.%m.%Y")
+
+
+def build_legacy(contacts):
+    records = []
+    for name, phones, birthday in contacts:
+        record = LegacyRecord(name)
+        record.phones = [LegacyField(phone) for phone in phones]
+        record.birthday = LegacyField(birthday)
+        records.append(record)
+    return records
+
+
+def build_current(contacts):
+    records = []
+    for name, phones, birthday in contacts:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        record.add_birthday(birthday)
+        records.append(record)
+    return records
+
+
+def measure(build, count: int) -> tuple[float, float]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build(make_contacts(count))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pickled = len(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL))
+    return (after - before) / len(records), pickled / len(records)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'model':<10}{'bytes/contact':>15}{'pickle bytes/contact':>22}")
+    for label, build in (("before", build_legacy), ("after", build_current)):
+        memory, pickled = measure(build, count)
+        print(f"{label:<10}{memory:>15.0f}{pickled:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for sharded birthday and report queries.
+
+Builds a synthetic book and times a 7-day birthday window and a month report
+through ShardedBook with a growing number of worker processes, next to the
+in-process birthday index. Scaling is bounded by the CPUs of the machine;
+with one worker, or below MIN_SHARDED_RECORDS contacts, ShardedBook answers
+in process and the row says so.
+
+Usage:
+    python benchmarks/sharded_reports.py [count] [max_workers]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "my_contacts_book", "my_contacts_book"))
+
+from address_book import AddressBook  # noqa: E402
+from birthday import Birthday  # noqa: E402
+from phone import Phone  # noqa: E402
+from record import Record  # noqa: E402
+from sharding import ShardedBook, born_in_month  # noqa: E402
+
+
+def make_book(count: int) -> AddressBook:
+    """
+    Generates a book of contacts with one or two phones and a birthday.
+
+    Args:
+        count (int): The number of contacts.
+
+    Returns:
+        AddressBook: The generated book.
+    """
+    rng = random.Random(42)
+    first, last = date(1940, 1, 1).toordinal(), date(2010, 12, 31).toordinal()
+    book = AddressBook()
+    for i in range(count):
+        record = Record(f"Contact{i}")
+        record.phones = [Phone(f"0{rng.randrange(10 ** 9):09d}") for _ in range(rng.randint(1, 2))]
+        record.birthday = Birthday(date.fromordinal(rng.randint(first, last)).strftime("%d.%m.%Y"))
+        book.add_record(record)
+    return book
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    book = make_book(count)
+    print(f"{count} contacts, {os.cpu_count()} CPUs")
+    print(f"{'birthday index, in process':<32}{timed(lambda: book.get_upcoming_birthdays(7)):8.3f} s")
+    workers = 1
+    while workers <= max_workers:
+        shard_size = -(-count // (workers * 4))
+        with ShardedBook(book, workers=workers, shard_size=shard_size) as sharded:
+            sharded.report(partial(born_in_month, 1))  # start the workers
+            window = timed(lambda: sharded.upcoming_birthdays(7))
+            report = timed(lambda: sharded.report(partial(born_in_month, 5)))
+            mode = "sharded" if sharded.sharded else "in process"
+        print(f"{workers:>2} workers: window {window:8.3f} s, month report {report:8.3f} s ({mode})")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark for the start-up time of the bot.
+
+Runs `python -X importtime` on the main module and lists the imports with
+the largest cumulative cost, then times one-shot invocations such as
+`my_contacts_book phone <name>` against pickled and memory-mapped books of
+a given size.
+
+Usage:
+    python benchmarks/startup.py [count] [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "my_contacts_book", "my_contacts_book")
+sys.path.insert(0, PACKAGE_DIR)
+
+from main import save_data  # noqa: E402
+from mmap_book import write_snapshot  # noqa: E402
+from suite import make_book  # noqa: E402
+
+MAIN = os.path.join(PACKAGE_DIR, "main.py")
+TOP_IMPORTS = 15
+
+
+def import_times() -> List[Tuple[int, int, str]]:
+    """
+    Measures the imports of the main module in a fresh interpreter.
+
+    Returns:
+        List[Tuple[int, int, str]]: Self and cumulative microseconds and the
+        module name of every import, largest cumulative cost first.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows
+
+
+def wall_time(command: List[str], workdir: str, runs: int) -> float:
+    """
+    Runs a command repeatedly and returns its median wall time in seconds.
+    """
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, check=False)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    rows = import_times()
+    print(f"import main: {rows[0][1] / 1e3:.1f} ms; largest imports:")
+    for self_us, cumulative_us, module in rows[1:TOP_IMPORTS + 1]:
+        print(f"{cumulative_us / 1e3:9.1f} ms {self_us / 1e3:9.1f} ms self  {module}")
+
+    book = make_book(count)
+    name = next(iter(book.data))
+    with tempfile.TemporaryDirectory() as pickle_dir, tempfile.TemporaryDirectory() as mmap_dir:
+        save_data(book, os.path.join(pickle_dir, "addressbook.pkl"))
+        write_snapshot(book, os.path.join(mmap_dir, "addressbook.mcb"))
+        print(f"\nOne-shot commands, {count} contacts, median of {runs} runs:")
+        elapsed = wall_time([sys.executable, "-c", "pass"], pickle_dir, runs)
+        print(f"{'bare interpreter':<32}{elapsed * 1e3:9.1f} ms")
+        for label, workdir in (("pickle", pickle_dir), ("mmap", mmap_dir)):
+            for args in (["hello"], ["phone", name]):
+                elapsed = wall_time([sys.executable, MAIN, *args], workdir, runs)
+                print(f"{label + ': ' + ' '.join(args):<32}{elapsed * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
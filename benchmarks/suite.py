@@ -0,0 +1,289 @@
+"""
+Benchmark suite for the address book hot paths.
+
+Generates synthetic books of the requested sizes and measures lookups, the
+command handlers and the persistence paths. Every case reports latency
+percentiles, throughput and the peak memory allocated while it runs; the
+results are written as JSON and can be compared with an earlier run.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000 10000 100000] [--output results.json]
+                               [--compare baseline.json] [--cases find,show_all] [--seed 42]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "my_contacts_book", "my_contacts_book"))
+
+from address_book import AddressBook  # noqa: E402
+from birthday import Birthday, format_birthday  # noqa: E402
+from dedupe import find_book_duplicates  # noqa: E402
+from handlers import add_contact, birthdays, search_contacts, show_all, show_phone  # noqa: E402
+from main import load_data, save_data  # noqa: E402
+from mmap_book import MmapAddressBook, write_snapshot  # noqa: E402
+from phone import Phone  # noqa: E402
+from record import Record  # noqa: E402
+
+OPERATOR_CODES = ["050", "063", "066", "067", "068", "073", "093", "095", "096", "097", "098", "099"]
+FIRST_NAMES = ["Olena", "Andrii", "Iryna", "Oksana", "Taras", "Mariia", "Dmytro", "Nataliia", "Serhii",
+               "Yulia", "Oleksandr", "Kateryna", "Bohdan", "Sofiia", "Maksym", "Anna", "Ivan", "Daryna"]
+# Share of contacts with one, two and three phones.
+PHONE_COUNT_WEIGHTS = [70, 25, 5]
+# Share of contacts with a birthday.
+BIRTHDAY_RATE = 0.9
+# Minimum time and iteration bounds per case.
+CASE_SECONDS = 0.5
+MIN_ITERATIONS = 3
+MAX_ITERATIONS = 10000
+MEMORY_ITERATIONS = 3
+
+
+def make_contacts(count: int, seed: int = 42) -> Iterator[Tuple[str, List[str], Optional[date]]]:
+    """
+    Generates realistic synthetic contacts.
+
+    Phones use Ukrainian mobile operator codes, most contacts have one phone
+    and some two or three, and ages follow a normal distribution around 40
+    years clipped to 16..90.
+
+    Args:
+        count (int): The number of contacts.
+        seed (int): The random seed, so runs are reproducible.
+
+    Yields:
+        Tuple[str, List[str], Optional[date]]: A unique name, its phones and the birthday, if any.
+    """
+    rng = random.Random(seed)
+    this_year = date.today().year
+    for i in range(count):
+        phones = [f"{rng.choice(OPERATOR_CODES)}{rng.randrange(10 ** 7):07d}"
+                  for _ in range(rng.choices((1, 2, 3), PHONE_COUNT_WEIGHTS)[0])]
+        birthday = None
+        if rng.random() < BIRTHDAY_RATE:
+            age = min(90, max(16, int(rng.gauss(40, 14))))
+            birthday = date(this_year - age, 1, 1).toordinal() + rng.randrange(365)
+            birthday = date.fromordinal(birthday)
+        yield f"{rng.choice(FIRST_NAMES)}{i}", phones, birthday
+
+
+def make_book(count: int, seed: int = 42) -> AddressBook:
+    """
+    Builds an address book of synthetic contacts.
+
+    Args:
+        count (int): The number of contacts.
+        seed (int): The random seed.
+
+    Returns:
+        AddressBook: The generated book.
+    """
+    book = AddressBook()
+    for name, phones, birthday in make_contacts(count, seed):
+        record = Record(name)
+        record.phones = [Phone(phone) for phone in phones]
+        if birthday:
+            record.birthday = Birthday(format_birthday(birthday))
+        book.add_record(record)
+    return book
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """
+    Returns a percentile of sorted samples by the nearest-rank method.
+    """
+    return samples[min(len(samples) - 1, max(0, round(fraction * len(samples)) - 1))]
+
+
+def measure(operation: Callable[[int], object]) -> Dict[str, float]:
+    """
+    Times an operation repeatedly and measures its peak allocation.
+
+    Args:
+        operation (Callable[[int], object]): Called with the iteration number.
+
+    Returns:
+        Dict[str, float]: Iterations, latency percentiles in microseconds,
+        operations per second and peak traced memory in bytes.
+    """
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_ITERATIONS and (
+            len(samples) < MIN_ITERATIONS or time.perf_counter() - started < CASE_SECONDS):
+        begin = time.perf_counter()
+        operation(len(samples))
+        samples.append(time.perf_counter() - begin)
+    total = sum(samples)
+
+    tracemalloc.start()
+    for i in range(MEMORY_ITERATIONS):
+        operation(len(samples) + i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p90_us": percentile(samples, 0.90) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "max_us": samples[-1] * 1e6,
+        "ops_per_second": len(samples) / total if total else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def consume(response) -> str:
+    return response if isinstance(response, str) else "".join(response)
+
+
+def remove_added(book: AddressBook) -> None:
+    """
+    Deletes the contacts added by the add_contact case, so later cases see the generated book.
+    """
+    i = 0
+    while f"Benchmark{i}" in book.data:
+        del book[f"Benchmark{i}"]
+        i += 1
+
+
+def make_cases(book: AddressBook, workdir: str, seed: int) -> Dict[str, Callable[[int], object]]:
+    """
+    Defines the benchmark cases for a book.
+
+    Args:
+        book (AddressBook): The book under test.
+        workdir (str): A directory for the persistence cases.
+        seed (int): The random seed for picking names.
+
+    Returns:
+        Dict[str, Callable[[int], object]]: The cases by name.
+    """
+    rng = random.Random(seed)
+    names = rng.sample(list(book.data), min(len(book), 1000))
+    pickle_path = os.path.join(workdir, "addressbook.pkl")
+    mmap_path = os.path.join(workdir, "addressbook.mcb")
+    save_data(book, pickle_path)
+    write_snapshot(book, mmap_path)
+
+    def add(i: int) -> None:
+        add_contact([f"Benchmark{i}", f"0{i:09d}"], book)
+
+    def load_mmap(i: int) -> None:
+        mmap_book = MmapAddressBook(mmap_path)
+        mmap_book.find(names[i % len(names)])
+        mmap_book.close()
+
+    return {
+        "find": lambda i: book.find(names[i % len(names)]),
+        "find_missing": lambda i: book.find(f"Missing{i}"),
+        "find_by_phone": lambda i: book.find_by_phone(book.data[names[i % len(names)]].phones[0].value),
+        "search_command": lambda i: search_contacts([names[i % len(names)][:4]], book),
+        "add_contact": add,
+        "phone_command": lambda i: show_phone([names[i % len(names)]], book),
+        "get_upcoming_birthdays": lambda i: book.get_upcoming_birthdays(7),
+        "birthdays_command": lambda i: birthdays([], book),
+        "show_all_page": lambda i: show_all(["--page", "1"], book),
+        "show_all": lambda i: consume(show_all([], book)),
+        "find_duplicates": lambda i: find_book_duplicates(book),
+        "save_data": lambda i: save_data(book, pickle_path),
+        "load_data": lambda i: load_data(pickle_path),
+        "save_mmap": lambda i: write_snapshot(book, mmap_path),
+        "load_mmap": load_mmap,
+    }
+
+
+def run(sizes: List[int], selected: Optional[List[str]], seed: int) -> dict:
+    """
+    Runs the suite for every book size.
+
+    Args:
+        sizes (List[int]): The book sizes.
+        selected (Optional[List[str]]): The cases to run, all by default.
+        seed (int): The random seed.
+
+    Returns:
+        dict: The results with the environment they were measured in.
+    """
+    results = {"environment": environment(), "seed": seed, "sizes": {}}
+    for size in sizes:
+        started = time.perf_counter()
+        book = make_book(size, seed)
+        build_seconds = time.perf_counter() - started
+        size_results = {"build_seconds": build_seconds,
+                        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                        "cases": {}}
+        with tempfile.TemporaryDirectory() as workdir:
+            cases = make_cases(book, workdir, seed)
+            for name, operation in cases.items():
+                if selected and name not in selected:
+                    continue
+                size_results["cases"][name] = result = measure(operation)
+                print(f"{size:>9} {name:<24}p50 {result['p50_us']:>12.1f} us  p99 {result['p99_us']:>12.1f} us  "
+                      f"{result['ops_per_second']:>12.1f} ops/s  peak {result['peak_bytes'] / 1e6:>9.2f} MB",
+                      flush=True)
+                remove_added(book)
+        results["sizes"][str(size)] = size_results
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """
+    Prints the p50 latency ratio of every case against a baseline run (>1 means slower).
+    """
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'}:")
+    for size, size_results in results["sizes"].items():
+        old_cases = baseline["sizes"].get(size, {}).get("cases", {})
+        for name, result in size_results["cases"].items():
+            old = old_cases.get(name)
+            if old and old["p50_us"]:
+                ratio = result["p50_us"] / old["p50_us"]
+                flag = "  <-- slower" if ratio > 1.2 else ""
+                print(f"{size:>9} {name:<24}{ratio:8.2f}x{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the address book hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="book sizes to benchmark (10**3 to 10**7)")
+    parser.add_argument("--cases", help="comma-separated case names, all by default")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the synthetic books")
+    options = parser.parse_args()
+    results = run(options.sizes, options.cases.split(",") if options.cases else None, options.seed)
+    with open(options.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {options.output}.")
+    if options.compare:
+        with open(options.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
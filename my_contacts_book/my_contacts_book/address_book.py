@@ -1,19 +1,397 @@
+import threading
+import weakref
 from collections import UserDict
-from typing import List, Optional
+from contextlib import contextmanager, nullcontext
+from itertools import groupby, islice
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+from locking import NULL_LOCK, RWLock
 from record import Record
-from datetime import datetime, timedelta
+from search import NameIndex
+from datetime import date, timedelta
+
+# Day-of-year offsets on a leap-year calendar, so every (month, day) pair
+# including Feb 29 gets its own bucket in the birthday index.
+_MONTH_OFFSETS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+_DAYS_IN_INDEX = 366
+_FEB_29 = _MONTH_OFFSETS[1] + 28
+
+
+def _is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def birthday_bucket(month: int, day: int) -> int:
+    """
+    Returns the birthday index bucket for a month and day.
+
+    Args:
+        month (int): The month of the birthday.
+        day (int): The day of the birthday.
+
+    Returns:
+        int: The bucket number in range 0..365.
+    """
+    return _MONTH_OFFSETS[month - 1] + day - 1
+
+
+def window_buckets(days: int, today: Optional[date] = None) -> List[int]:
+    """
+    Returns the birthday buckets of a window, in date order.
+
+    The window starts today and wraps across the new year. In non-leap years
+    the Feb 29 bucket is observed on Mar 1.
+
+    Args:
+        days (int): The size of the window in days, today included.
+        today (Optional[date]): The first day of the window, date.today() by default.
+
+    Returns:
+        List[int]: The buckets, each listed once.
+    """
+    today = today or date.today()
+    buckets = []
+    visited = set()
+    for offset in range(min(days, _DAYS_IN_INDEX) + 1):
+        day = today + timedelta(days=offset)
+        if day.month == 3 and day.day == 1 and not _is_leap(day.year):
+            candidates = (_FEB_29, birthday_bucket(3, 1))
+        else:
+            candidates = (birthday_bucket(day.month, day.day),)
+        for bucket in candidates:
+            if bucket not in visited:
+                visited.add(bucket)
+                buckets.append(bucket)
+    return buckets
+
+
+def next_birthday(birthday: date, today: date) -> date:
+    """
+    Returns the first celebration of a birthday on or after today.
+
+    In non-leap years Feb 29 birthdays are celebrated on Mar 1.
+
+    Args:
+        birthday (date): The date of birth.
+        today (date): The first day to consider.
+
+    Returns:
+        date: The date of the next celebration.
+    """
+    for year in (today.year, today.year + 1):
+        if birthday.month == 2 and birthday.day == 29 and not _is_leap(year):
+            celebration = date(year, 3, 1)
+        else:
+            celebration = birthday.replace(year=year)
+        if celebration >= today:
+            return celebration
+    return celebration
+
+
+def congratulation_date(day: date) -> date:
+    """
+    Moves a date that falls on a weekend to the following Monday.
+
+    Args:
+        day (date): The celebration date.
+
+    Returns:
+        date: The date to congratulate on.
+    """
+    if day.weekday() >= 5:
+        return day + timedelta(days=7 - day.weekday())
+    return day
+
 
 class AddressBook(UserDict):
     """
     Class to represent an address book.
 
+    The book keeps a day-of-year index of birthdays, so upcoming birthday
+    queries only touch the contacts whose birthdays fall inside the window.
+
+    Every mutation, whether made through the book or through one of its
+    records, is reported to the listeners registered with subscribe() as
+    an event tuple (op, name, *args):
+
+        ("add", name, phones, birthday)
+        ("delete", name)
+        ("add_phone", name, phone)
+        ("remove_phone", name, phone)
+        ("edit_phone", name, old_phone, new_phone)
+        ("set_birthday", name, birthday)
+
+    Listeners registered with subscribe_before() are called with the name
+    and the current record (None for a new name) just before a contact
+    changes, which is how History captures the state an undo restores.
+
+    By default the book is not locked. After make_thread_safe(), mutators
+    (including record edits) hold a reader/writer lock for writing and
+    lookups hold it for reading, and snapshot() returns a copy-on-write view
+    for long scans and saving.
+
     Methods:
         add_record(record): Adds a record to the address book.
         find(name): Finds a record by name.
         delete(name): Deletes a record by name.
-        get_upcoming_birthdays(): Gets contacts with upcoming birthdays within the next 7 days.
+        find_by_phone(phone): Finds the records that contain a phone number.
+        search(fragment): Finds records by name prefix or similar names.
+        index_names(background): Builds the name index ahead of the first search.
+        get_upcoming_birthdays(days): Gets contacts with upcoming birthdays within the next `days` days (7 by default).
+        upcoming_congratulations(days, limit): Gets congratulation dates of upcoming birthdays, sorted.
+        subscribe(listener): Registers a listener for mutation events.
+        subscribe_before(listener): Registers a listener called before a contact changes.
+        unsubscribe(listener): Removes a registered listener.
+        make_thread_safe(): Enables locking for use from several threads.
+        locked(): Holds the write lock inside a block.
+        snapshot(): Returns a consistent read-only view of the book.
     """
 
+    # Sequence number of the last journal entry contained in a saved snapshot.
+    journal_seq = 0
+    # Number of mutations since the book was created or loaded; savers compare
+    # it with the value they last saved to tell whether the book is dirty.
+    changes = 0
+    # The undo history attached to the book, if any; see history.History.
+    history = None
+
+    def __init__(self, *args, **kwargs):
+        self._birthday_index: List[Dict[str, None]] = [{} for _ in range(_DAYS_IN_INDEX)]
+        self._phone_index: Dict[str, Dict[str, None]] = {}
+        self._listeners: List[Callable] = []
+        self._before_listeners: List[Callable] = []
+        self._name_index: Optional[NameIndex] = None
+        self._indexer: Optional[threading.Thread] = None
+        self._lock = NULL_LOCK
+        self._snapshots: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, name: str, record: Record) -> None:
+        with self._lock.write():
+            if self._before_listeners:
+                self._before_change(name, self.data.get(name))
+            if name in self.data:
+                old = self.data[name]
+                self._unindex(old)
+                # A replaced record no longer reports its edits to the book.
+                old.book = None
+            self.data[name] = record
+            record.book = self
+            self._index(record)
+            birthday = str(record.birthday) if record.birthday else None
+            self._emit("add", name, [p.value for p in record.phones], birthday)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock.write():
+            if self._before_listeners:
+                self._before_change(name, self.data[name])
+            record = self.data.pop(name)
+            self._unindex(record)
+            record.book = None
+            self._emit("delete", name)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_birthday_index"]
+        del state["_phone_index"]
+        del state["_listeners"]
+        del state["_before_listeners"]
+        del state["_name_index"]
+        del state["_indexer"]
+        del state["_lock"]
+        del state["_snapshots"]
+        state.pop("changes", None)
+        state.pop("history", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._listeners = []
+        self._before_listeners = []
+        self._name_index = None
+        self._indexer = None
+        self._lock = NULL_LOCK
+        self._snapshots = weakref.WeakValueDictionary()
+        self._rebuild_indexes()
+
+    def make_thread_safe(self) -> "AddressBook":
+        """
+        Enables reader/writer locking, so the book can be shared between threads.
+
+        Returns:
+            AddressBook: The book itself.
+        """
+        if self._lock is NULL_LOCK:
+            self._lock = RWLock()
+        return self
+
+    def locked(self) -> ContextManager:
+        """
+        Holds the write lock inside the block, so several operations apply atomically.
+        """
+        return self._lock.write()
+
+    def snapshot(self) -> "AddressBook":
+        """
+        Returns a consistent read-only view of the book.
+
+        Taking a snapshot only copies the name-to-record mapping. Afterwards a
+        record is copied the first time it is edited, so the snapshot keeps the
+        old version and scans or saves of the snapshot never block writers.
+        The view is meant for iterating records and pickling; its lookup
+        indexes are empty. A book without locking has no concurrent writers
+        and is returned as is.
+
+        Returns:
+            AddressBook: The snapshot.
+        """
+        if self._lock is NULL_LOCK:
+            return self
+        with self._lock.write():
+            snapshot = AddressBook()
+            snapshot.data = dict(self.data)
+            snapshot.journal_seq = self.journal_seq
+            snapshot.changes = self.changes
+            self._snapshots[id(snapshot)] = snapshot
+        return snapshot
+
+    def _changing(self, record: Record) -> ContextManager:
+        """
+        Returns the context a record edit runs in.
+
+        Called by Record before it changes itself; in thread-safe mode the
+        edit holds the write lock and snapshots keep a copy of the old record.
+        """
+        if self._lock is NULL_LOCK:
+            if self._before_listeners:
+                self._before_change(record.name.value, record)
+            return nullcontext()
+        return self._locked_change(record)
+
+    @contextmanager
+    def _locked_change(self, record: Record):
+        with self._lock.write():
+            name = record.name.value
+            for snapshot in self._snapshots.values():
+                snapshot._preserve(name, record)
+            if self._before_listeners:
+                self._before_change(name, record)
+            yield
+
+    def _preserve(self, name: str, record: Record) -> None:
+        """
+        Keeps the current version of a record in this snapshot.
+
+        Called on every snapshot of the book before one of its records is
+        edited; a snapshot still sharing the record swaps in a copy.
+        """
+        if self.data.get(name) is record:
+            self.data[name] = record.copy()
+
+    def subscribe(self, listener: Callable) -> None:
+        """
+        Registers a listener that is called with every mutation event.
+
+        Args:
+            listener (Callable): Called as listener(op, name, *args).
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable) -> None:
+        """
+        Removes a previously registered listener.
+
+        Args:
+            listener (Callable): The listener to remove.
+        """
+        self._listeners.remove(listener)
+
+    def subscribe_before(self, listener: Callable) -> None:
+        """
+        Registers a listener that is called just before a contact changes.
+
+        Args:
+            listener (Callable): Called as listener(name, record), with record
+                None when the name is not in the book yet.
+        """
+        self._before_listeners.append(listener)
+
+    def unsubscribe_before(self, listener: Callable) -> None:
+        """
+        Removes a listener registered with subscribe_before().
+
+        Args:
+            listener (Callable): The listener to remove.
+        """
+        self._before_listeners.remove(listener)
+
+    def _before_change(self, name: str, record: Optional[Record]) -> None:
+        for listener in self._before_listeners:
+            listener(name, record)
+
+    def _emit(self, op: str, name: str, *args) -> None:
+        self.changes += 1
+        for listener in self._listeners:
+            listener(op, name, *args)
+
+    def _rebuild_indexes(self) -> None:
+        self._birthday_index = [{} for _ in range(_DAYS_IN_INDEX)]
+        self._phone_index = {}
+        for record in self.data.values():
+            record.book = self
+            self._index(record)
+
+    def _index(self, record: Record) -> None:
+        self._index_birthday(record)
+        for phone in record.phones:
+            self._index_phone(record.name.value, phone.value)
+
+    def _index_birthday(self, record: Record) -> None:
+        if record.birthday:
+            birthday = record.birthday.value
+            self._birthday_index[birthday_bucket(birthday.month, birthday.day)][record.name.value] = None
+
+    def _unindex(self, record: Record) -> None:
+        self._unindex_birthday(record, record.birthday)
+        for phone in record.phones:
+            self._unindex_phone(record.name.value, phone.value)
+
+    def _index_phone(self, name: str, phone: str) -> None:
+        self._phone_index.setdefault(phone, {})[name] = None
+
+    def _unindex_phone(self, name: str, phone: str) -> None:
+        owners = self._phone_index.get(phone)
+        if owners is not None:
+            owners.pop(name, None)
+            if not owners:
+                del self._phone_index[phone]
+
+    def _unindex_birthday(self, record: Record, birthday) -> None:
+        if birthday:
+            self._birthday_index[birthday_bucket(birthday.value.month, birthday.value.day)].pop(record.name.value, None)
+
+    def _birthday_changed(self, record: Record, old_birthday) -> None:
+        """
+        Moves a record to the bucket of its new birthday.
+
+        Called by Record whenever its birthday is set or replaced.
+        """
+        self._unindex_birthday(record, old_birthday)
+        self._index_birthday(record)
+        self._emit("set_birthday", record.name.value, str(record.birthday))
+
+    def _phone_added(self, record: Record, phone: str) -> None:
+        self._index_phone(record.name.value, phone)
+        self._emit("add_phone", record.name.value, phone)
+
+    def _phone_removed(self, record: Record, phone: str) -> None:
+        self._unindex_phone(record.name.value, phone)
+        self._emit("remove_phone", record.name.value, phone)
+
+    def _phone_edited(self, record: Record, old_phone: str, new_phone: str) -> None:
+        self._unindex_phone(record.name.value, old_phone)
+        self._index_phone(record.name.value, new_phone)
+        self._emit("edit_phone", record.name.value, old_phone, new_phone)
+
     def add_record(self, record: Record) -> None:
         """
         Adds a record to the address book.
@@ -21,10 +399,11 @@ class AddressBook(UserDict):
         Args:
             record (Record): The record to add.
         """
-        if record.name.value in self.data:
-            print(f"Contact {record.name} already exists.")
-        else:
-            self.data[record.name.value] = record
+        with self._lock.write():
+            if record.name.value in self.data:
+                print(f"Contact {record.name} already exists.")
+            else:
+                self[record.name.value] = record
 
     def find(self, name: str) -> Optional[Record]:
         """
@@ -36,7 +415,8 @@ class AddressBook(UserDict):
         Returns:
             Optional[Record]: The found record, or None if not found.
         """
-        return self.data.get(name, None)
+        with self._lock.read():
+            return self.data.get(name, None)
 
     def delete(self, name: str) -> None:
         """
@@ -45,24 +425,129 @@ class AddressBook(UserDict):
         Args:
             name (str): The name of the record to delete.
         """
-        if name in self.data:
-            del self.data[name]
-        else:
-            print(f"Contact {name} not found.")
+        with self._lock.write():
+            if name in self.data:
+                del self[name]
+            else:
+                print(f"Contact {name} not found.")
+
+    def find_by_phone(self, phone: str) -> List[Record]:
+        """
+        Finds the records that contain a phone number using the reverse phone index.
+
+        Args:
+            phone (str): The phone number to look up.
 
-    def get_upcoming_birthdays(self) -> List[Record]:
+        Returns:
+            List[Record]: The records holding the number, empty if nobody has it.
         """
-        Gets contacts with upcoming birthdays within the next 7 days.
+        with self._lock.read():
+            return [self.data[name] for name in self._phone_index.get(phone, ())]
+
+    def search(self, fragment: str, limit: int = 10) -> List[Record]:
+        """
+        Searches contacts by name prefix, falling back to typo-tolerant matches.
+
+        The name index is built by index_names(), or on the first search if
+        that was not called, and then kept up to date incrementally.
+
+        Args:
+            fragment (str): The name fragment, in any case or keyboard layout.
+            limit (int): The maximum number of records to return.
 
         Returns:
-            List[Record]: A list of records with upcoming birthdays.
+            List[Record]: The matching records, best matches first.
+        """
+        if self._name_index is None:
+            if self._indexer is not None:
+                self._indexer.join()
+            else:
+                self.index_names()
+        with self._lock.read():
+            return [self.data[name] for name in self._name_index.search(fragment, limit)]
+
+    def index_names(self, background: bool = False) -> None:
+        """
+        Builds the name index used by search(), so the first search does not pay for it.
+
+        With `background`, a thread-safe book is indexed on a separate thread:
+        edits made meanwhile are buffered and applied once the index is built,
+        and a search made before then waits for it.
+
+        Args:
+            background (bool): Whether to build the index on a separate thread.
+        """
+        with self._lock.write():
+            if self._name_index is not None or self._indexer is not None:
+                return
+            if not background or self._lock is NULL_LOCK:
+                self._name_index = NameIndex(iter(self.data))
+                self.subscribe(self._name_index.on_event)
+                return
+            missed: List[tuple] = []
+
+            def buffer(*event) -> None:
+                missed.append(event)
+
+            self.subscribe(buffer)
+            self._indexer = threading.Thread(target=self._build_name_index, args=(list(self.data), missed, buffer),
+                                             daemon=True)
+            self._indexer.start()
+
+    def _build_name_index(self, names: List[str], missed: List[tuple], buffer: Callable) -> None:
+        index = NameIndex(names)
+        with self._lock.write():
+            self.unsubscribe(buffer)
+            for event in missed:
+                index.on_event(*event)
+            self.subscribe(index.on_event)
+            self._name_index = index
+
+    def get_upcoming_birthdays(self, days: int = 7, today: Optional[date] = None) -> List[Record]:
+        """
+        Gets contacts with upcoming birthdays within the next `days` days.
+
+        Only the index buckets inside the window are visited, and the window
+        wraps across the new year. In non-leap years Feb 29 birthdays are
+        celebrated on Mar 1.
+
+        Args:
+            days (int): The size of the window in days, today included.
+            today (Optional[date]): The first day of the window, date.today() by default.
+
+        Returns:
+            List[Record]: A list of records with upcoming birthdays, in date order.
         """
-        today = datetime.today()
         upcoming_birthdays = []
-        for record in self.data.values():
-            if record.birthday:
-                birthday = datetime.strptime(record.birthday.value, "%d.%m.%Y")
-                birthday = birthday.replace(year=today.year)
-                if today <= birthday <= today + timedelta(days=7):
-                    upcoming_birthdays.append(record)
-        return upcoming_birthdays
\ No newline at end of file
+        with self._lock.read():
+            for bucket in window_buckets(days, today):
+                upcoming_birthdays.extend(self.data[name] for name in self._birthday_index[bucket])
+        return upcoming_birthdays
+
+    def upcoming_congratulations(self, days: int = 7, today: Optional[date] = None,
+                                 limit: Optional[int] = None) -> List[Tuple[date, Record]]:
+        """
+        Gets the congratulation dates of upcoming birthdays, earliest first.
+
+        Birthdays falling on a weekend are congratulated on the following
+        Monday. Only the birthday index buckets inside the window are read.
+        They come in date order, and shifting weekends to Monday keeps that
+        order, so only the contacts congratulated on the same day are sorted,
+        and with a limit the congratulation dates past the first `limit`
+        entries are never computed.
+
+        Args:
+            days (int): The size of the window in days, today included.
+            today (Optional[date]): The first day of the window, date.today() by default.
+            limit (Optional[int]): The maximum number of entries to return.
+
+        Returns:
+            List[Tuple[date, Record]]: The congratulation dates with their records,
+            sorted by date and then by name.
+        """
+        today = today or date.today()
+        by_day = groupby(self.get_upcoming_birthdays(days, today),
+                         key=lambda record: congratulation_date(next_birthday(record.birthday.value, today)))
+        entries = ((day, record) for day, records in by_day
+                   for record in sorted(records, key=lambda record: record.name.value))
+        return list(islice(entries, limit))
@@ -0,0 +1,41 @@
+import os
+import stat
+
+# mkstemp creates files readable only by their owner; a new file gets the mode
+# open() would give it instead. The umask can only be read by setting it, so
+# it is read once at import, before any background thread writes files.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+def atomic_write(filename: str, data: bytes) -> None:
+    """
+    Replaces a file with new contents so readers see either the old or the new file.
+
+    The data goes to a temporary file in the same directory, which is
+    fsynced and then renamed over the target. The file keeps the permissions
+    of the file it replaces; a new file is created with the umask applied.
+
+    Args:
+        filename (str): The file to replace.
+        data (bytes): The new contents.
+    """
+    import tempfile
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(filename) + ".",
+                                     dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        try:
+            mode = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filename)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
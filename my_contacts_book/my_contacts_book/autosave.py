@@ -0,0 +1,85 @@
+import threading
+from typing import Callable
+from address_book import AddressBook
+
+
+class Autosaver:
+    """
+    Saves an address book in the background whenever it has unsaved changes.
+
+    A save starts every `interval` seconds, or as soon as `max_changes`
+    mutations are pending, and is skipped when nothing changed since the last
+    one. The book is switched to thread-safe mode, so each save writes a
+    copy-on-write snapshot while edits continue.
+
+    Attributes:
+        book (AddressBook): The saved address book.
+        saved_changes (int): The book's change count at the last save.
+    """
+
+    def __init__(self, book: AddressBook, save: Callable[[AddressBook], None],
+                 interval: float = 5.0, max_changes: int = 100):
+        """
+        Starts the autosave thread.
+
+        Args:
+            book (AddressBook): The address book to save.
+            save (Callable[[AddressBook], None]): Writes a snapshot of the book to storage.
+            interval (float): The maximum time in seconds a change stays unsaved.
+            max_changes (int): The number of pending changes that triggers an immediate save.
+        """
+        self.book = book.make_thread_safe()
+        self.save = save
+        self.interval = interval
+        self.max_changes = max_changes
+        self.saved_changes = book.changes
+        self._save_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        book.subscribe(self._on_change)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the book has changes that are not saved yet.
+        """
+        return self.book.changes != self.saved_changes
+
+    def flush(self) -> bool:
+        """
+        Saves the book now if it has unsaved changes.
+
+        Returns:
+            bool: Whether a save was written.
+        """
+        with self._save_lock:
+            snapshot = self.book.snapshot()
+            if snapshot.changes == self.saved_changes:
+                return False
+            self.save(snapshot)
+            self.saved_changes = snapshot.changes
+            return True
+
+    def close(self) -> None:
+        """
+        Stops the autosave thread and saves the remaining changes.
+        """
+        self.book.unsubscribe(self._on_change)
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def _on_change(self, *event) -> None:
+        if self.book.changes - self.saved_changes >= self.max_changes:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            self.flush()
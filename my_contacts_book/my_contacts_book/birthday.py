@@ -1,14 +1,73 @@
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 from field import Field
 
+_DATE_ERROR = "Invalid date format. Use DD.MM.YYYY"
+
+
+@lru_cache(maxsize=1 << 15)
+def parse_birthday(value: str) -> date:
+    """
+    Parses a DD.MM.YYYY string into a date without going through strptime.
+
+    The canonical zero-padded form is sliced directly; other spellings that
+    strptime used to accept (e.g. 1.2.2000) go through a slower split path.
+    Results are cached, since books tend to share the same dates.
+
+    Args:
+        value (str): The birthday value in DD.MM.YYYY format.
+
+    Returns:
+        date: The parsed date.
+
+    Raises:
+        ValueError: If the birthday value is not in the correct format.
+    """
+    if len(value) == 10 and value[2] == "." and value[5] == ".":
+        day, month, year = value[0:2], value[3:5], value[6:10]
+    else:
+        parts = value.split(".")
+        if len(parts) != 3:
+            raise ValueError(_DATE_ERROR)
+        day, month, year = parts
+        if not (0 < len(day) <= 2 and 0 < len(month) <= 2 and len(year) == 4):
+            raise ValueError(_DATE_ERROR)
+    if not (day.isascii() and day.isdigit() and month.isascii() and month.isdigit()
+            and year.isascii() and year.isdigit()):
+        raise ValueError(_DATE_ERROR)
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise ValueError(_DATE_ERROR)
+
+
+def format_birthday(value: date) -> str:
+    """
+    Formats a date back into the DD.MM.YYYY form.
+
+    Args:
+        value (date): The date to format.
+
+    Returns:
+        str: The formatted date.
+    """
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
+
+
 class Birthday(Field):
     """
     Class to represent a birthday field.
 
+    The date is stored as its proleptic Gregorian ordinal, not as the text it
+    was entered as, so str() always gives the zero-padded DD.MM.YYYY form:
+    a birthday entered as 5.3.1999 is shown and exported as 05.03.1999.
+
     Attributes:
-        value (str): The birthday value in DD.MM.YYYY format.
+        value (date): The parsed birthday date, rendered as DD.MM.YYYY by str().
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         """
         Initializes a Birthday instance.
@@ -18,7 +77,18 @@ class Birthday(Field):
         """
         self.value = self.validate_birthday(value)
 
-    def validate_birthday(self, value: str) -> str:
+    @property
+    def value(self) -> date:
+        return date.fromordinal(self._value)
+
+    @value.setter
+    def value(self, value: date) -> None:
+        if isinstance(value, str):
+            # Books pickled before birthdays were stored as dates.
+            value = parse_birthday(value)
+        self._value = value.toordinal()
+
+    def validate_birthday(self, value: str) -> date:
         """
         Validates and parses the birthday value.
 
@@ -26,13 +96,12 @@ class Birthday(Field):
             value (str): The birthday value in DD.MM.YYYY format.
 
         Returns:
-            str: The validated birthday value.
+            date: The parsed birthday date.
 
         Raises:
             ValueError: If the birthday value is not in the correct format.
         """
-        try:
-            datetime.strptime(value, "%d.%m.%Y")
-        except ValueError:
-            raise ValueError("Invalid date format. Use DD.MM.YYYY")
-        return value
\ No newline at end of file
+        return parse_birthday(value)
+
+    def __str__(self) -> str:
+        return format_birthday(self.value)
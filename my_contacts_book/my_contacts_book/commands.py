@@ -0,0 +1,142 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from address_book import AddressBook
+from colorama import Fore, Style
+
+Response = Union[str, Iterator[str]]
+
+
+class Command:
+    """
+    A bot command and the metadata other subsystems act on.
+
+    Attributes:
+        names (Tuple[str, ...]): The command name followed by its aliases.
+        handler (Callable): Called with (args, book), or with (args) when the command does not use the book.
+        usage (str): The command line syntax shown in the help.
+        description (str): The help text; further lines are indented under the first.
+        min_args (int): The minimum number of arguments.
+        max_args (Optional[int]): The maximum number of arguments, None for any number.
+        mutates (bool): Whether the command can change the book. The server runs the
+            others concurrently, and one-shot mode journals only these.
+        uses_book (bool): Whether the command reads the book at all.
+        uses_files (bool): Whether the command reads or writes files named by its arguments.
+    """
+
+    __slots__ = ("names", "handler", "usage", "description", "min_args", "max_args", "mutates", "uses_book",
+                 "uses_files")
+
+    def __init__(self, names: Tuple[str, ...], handler: Callable[..., Response], usage: str, description: str,
+                 min_args: int, max_args: Optional[int], mutates: bool, uses_book: bool, uses_files: bool = False):
+        self.names = names
+        self.handler = handler
+        self.usage = usage
+        self.description = description
+        self.min_args = min_args
+        self.max_args = max_args
+        self.mutates = mutates
+        self.uses_book = uses_book
+        self.uses_files = uses_files
+
+    def accepts(self, count: int) -> bool:
+        """
+        Checks the number of arguments against the arity of the command.
+        """
+        return count >= self.min_args and (self.max_args is None or count <= self.max_args)
+
+
+class CommandRegistry:
+    """
+    Registry of bot commands, dispatched by a single dict lookup.
+
+    The help text and the vocabulary of the command suggester are generated
+    from the registered commands, and the server, the one-shot mode and the
+    storage code consult their metadata instead of keeping command lists.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Command] = {}
+        self._ordered: List[Command] = []
+
+    def register(self, names: Union[str, Sequence[str]], handler: Callable[..., Response], usage: str,
+                 description: str, arity: Tuple[int, Optional[int]] = (0, 0), mutates: bool = False,
+                 uses_book: bool = True, uses_files: bool = False) -> Command:
+        """
+        Registers a command under its name and aliases.
+
+        Args:
+            names (Union[str, Sequence[str]]): The command name, or the name followed by aliases.
+            handler (Callable[..., Response]): The handler.
+            usage (str): The command line syntax shown in the help.
+            description (str): The help text.
+            arity (Tuple[int, Optional[int]]): The minimum and maximum number of arguments.
+            mutates (bool): Whether the command can change the book.
+            uses_book (bool): Whether the handler takes the book.
+            uses_files (bool): Whether the command reads or writes files named by its arguments.
+
+        Returns:
+            Command: The registered command.
+
+        Raises:
+            ValueError: If a name is already registered.
+        """
+        names = (names,) if isinstance(names, str) else tuple(names)
+        for name in names:
+            if name in self._commands:
+                raise ValueError(f"Command {name} is already registered.")
+        command = Command(names, handler, usage, description, arity[0], arity[1], mutates, uses_book, uses_files)
+        for name in names:
+            self._commands[name] = command
+        self._ordered.append(command)
+        return command
+
+    def get(self, name: str) -> Optional[Command]:
+        return self._commands.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._commands
+
+    def __iter__(self) -> Iterator[Command]:
+        return iter(self._ordered)
+
+    def names(self) -> List[str]:
+        """
+        Returns every command name and alias in registration order.
+        """
+        return list(self._commands)
+
+    def dispatch(self, action: str, args: List[str], book: Optional[AddressBook]) -> Response:
+        """
+        Runs a command.
+
+        Args:
+            action (str): The command name.
+            args (List[str]): The arguments for the command.
+            book (Optional[AddressBook]): The address book, unused by commands that do not read it.
+
+        Returns:
+            Response: The handler response, a usage error when the number of
+            arguments does not fit, or the list of commands for an unknown one.
+        """
+        command = self._commands.get(action)
+        if command is None:
+            return f"Invalid command. Available commands are: {', '.join(self._commands)}."
+        if not command.accepts(len(args)):
+            return f"{Fore.YELLOW}Error: Usage: {command.usage}{Style.RESET_ALL}"
+        if command.uses_book:
+            return command.handler(args, book)
+        return command.handler(args)
+
+    def help_text(self) -> str:
+        """
+        Formats the usage and description of every command.
+
+        Returns:
+            str: One entry per command, continuation lines aligned under the description.
+        """
+        lines = []
+        for command in self._ordered:
+            prefix = f"- {command.usage}: "
+            first, *rest = command.description.split("\n")
+            lines.append(prefix + first)
+            lines.extend(" " * len(prefix) + line for line in rest)
+        return "\n".join(lines)
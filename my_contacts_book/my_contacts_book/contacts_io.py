@@ -0,0 +1,271 @@
+import csv
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+from address_book import AddressBook
+from birthday import Birthday
+from phone import Phone
+from record import Record
+
+CSV_FIELDS = ["Name", "Phones", "Birthday"]
+VCARD_EXTENSIONS = (".vcf", ".vcard")
+
+# (line number, name, phones, birthday, raw source text)
+RawContact = Tuple[int, str, List[str], Optional[str], str]
+# (name, phones, birthday)
+Contact = Tuple[str, List[str], Optional[str]]
+# (line number, reason, raw source text)
+Reject = Tuple[int, str, str]
+
+
+def detect_format(path: str) -> str:
+    """
+    Detects the file format from its extension.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: "vcard" for .vcf/.vcard files, "csv" otherwise.
+    """
+    return "vcard" if path.lower().endswith(VCARD_EXTENSIONS) else "csv"
+
+
+def read_csv(path: str) -> Iterator[RawContact]:
+    """
+    Streams contacts from a CSV file with Name, Phones and Birthday columns.
+
+    Phones within a cell are separated by commas or semicolons.
+
+    Args:
+        path (str): The CSV file path.
+
+    Yields:
+        RawContact: The contacts in file order.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = {name.strip().lower(): i for i, name in enumerate(header)}
+        name_col = columns.get("name", 0)
+        phones_col = columns.get("phones", columns.get("phone", 1))
+        birthday_col = columns.get("birthday")
+        for row in reader:
+            if not any(row):
+                continue
+
+            def cell(index: Optional[int]) -> str:
+                return row[index].strip() if index is not None and index < len(row) else ""
+
+            phones = [p.strip() for p in cell(phones_col).replace(";", ",").split(",") if p.strip()]
+            yield reader.line_num, cell(name_col), phones, cell(birthday_col) or None, ",".join(row)
+
+
+def read_vcard(path: str) -> Iterator[RawContact]:
+    """
+    Streams contacts from a vCard file, using the FN, TEL and BDAY properties.
+
+    Args:
+        path (str): The vCard file path.
+
+    Yields:
+        RawContact: The contacts in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        card: Optional[List[str]] = None
+        start = 0
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\r\n")
+            if line[:1] in (" ", "\t") and card:
+                card[-1] += line[1:]
+                continue
+            upper = line.upper()
+            if upper == "BEGIN:VCARD":
+                card, start = [], line_number
+            elif upper == "END:VCARD" and card is not None:
+                yield _parse_vcard(start, card)
+                card = None
+            elif card is not None:
+                card.append(line)
+
+
+def _parse_vcard(line_number: int, lines: List[str]) -> RawContact:
+    name, phones, birthday = "", [], None
+    for line in lines:
+        key, _, value = line.partition(":")
+        prop = key.split(";")[0].upper()
+        if prop == "FN":
+            name = value.strip()
+        elif prop == "TEL":
+            phones.append(value.strip())
+        elif prop == "BDAY":
+            birthday = _vcard_date(value.strip())
+    return line_number, name, phones, birthday, "\n".join(lines)
+
+
+def _vcard_date(value: str) -> str:
+    digits = value.replace("-", "")
+    if len(digits) == 8 and digits.isdigit():
+        return f"{digits[6:8]}.{digits[4:6]}.{digits[0:4]}"
+    return value
+
+
+def validate_chunk(chunk: List[RawContact]) -> Tuple[List[Contact], List[Reject]]:
+    """
+    Validates a chunk of contacts with the Phone and Birthday rules.
+
+    This is a top-level function so it can run in a worker process.
+
+    Args:
+        chunk (List[RawContact]): The contacts to validate.
+
+    Returns:
+        Tuple[List[Contact], List[Reject]]: The valid contacts and the rejected ones with reasons.
+    """
+    valid, rejects = [], []
+    for line_number, name, phones, birthday, raw in chunk:
+        try:
+            if not name:
+                raise ValueError("Name is missing.")
+            if not phones:
+                raise ValueError("Phone is missing.")
+            phones = [Phone(phone).value for phone in phones]
+            if birthday:
+                birthday = str(Birthday(birthday))
+        except ValueError as e:
+            rejects.append((line_number, str(e), raw))
+        else:
+            valid.append((name.capitalize(), phones, birthday))
+    return valid, rejects
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Splits an iterable into lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _validated_chunks(chunks: Iterator[List[RawContact]], executor: Optional[Executor],
+                      max_pending: int) -> Iterator[Tuple[List[Contact], List[Reject]]]:
+    if executor is None:
+        yield from map(validate_chunk, chunks)
+        return
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(validate_chunk, chunk))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def apply_contact(book: AddressBook, contact: Contact) -> None:
+    """
+    Adds a validated contact to the book, merging phones into an existing record.
+
+    Args:
+        book (AddressBook): The address book instance.
+        contact (Contact): The validated contact.
+    """
+    name, phones, birthday = contact
+    record = book.find(name)
+    if record is None:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        if birthday:
+            record.add_birthday(birthday)
+        book.add_record(record)
+        return
+    for phone in phones:
+        if not record.find_phone(phone):
+            record.add_phone(phone)
+    if birthday:
+        record.add_birthday(birthday)
+
+
+def import_contacts(path: str, book: AddressBook, rejects_path: Optional[str] = None,
+                    workers: int = 0, chunk_size: int = 10000) -> Tuple[int, int]:
+    """
+    Imports contacts from a CSV or vCard file.
+
+    The file is read lazily and validated in chunks, optionally in a pool of
+    worker processes with a bounded number of chunks in flight, so memory use
+    does not depend on the file size. Invalid entries are written to the
+    rejects file instead of stopping the import.
+
+    Args:
+        path (str): The file to import.
+        book (AddressBook): The address book instance.
+        rejects_path (Optional[str]): Where to write rejected entries, <path>.rejects.csv by default.
+        workers (int): The number of worker processes, 0 to validate in this process.
+        chunk_size (int): The number of contacts validated together.
+
+    Returns:
+        Tuple[int, int]: The number of imported and rejected contacts.
+    """
+    reader = read_vcard if detect_format(path) == "vcard" else read_csv
+    rejects_path = rejects_path or f"{path}.rejects.csv"
+    imported = rejected = 0
+    chunks = chunked(reader(path), chunk_size)
+    executor = ProcessPoolExecutor(workers) if workers > 0 else None
+    rejects_file = None
+    try:
+        for valid, rejects in _validated_chunks(chunks, executor, max(2, workers * 2)):
+            for contact in valid:
+                apply_contact(book, contact)
+            imported += len(valid)
+            if rejects:
+                if rejects_file is None:
+                    rejects_file = open(rejects_path, "w", encoding="utf-8", newline="")
+                    rejects_writer = csv.writer(rejects_file)
+                    rejects_writer.writerow(["Line", "Reason", "Data"])
+                rejects_writer.writerows(rejects)
+                rejected += len(rejects)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if rejects_file is not None:
+            rejects_file.close()
+    if not rejected and os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    return imported, rejected
+
+
+def export_contacts(path: str, book: AddressBook) -> int:
+    """
+    Exports all contacts to a CSV or vCard file, streaming one record at a time.
+
+    Args:
+        path (str): The file to write.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        int: The number of exported contacts.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if detect_format(path) == "vcard":
+            for record in book.values():
+                lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{record.name}"]
+                lines.extend(f"TEL:{phone}" for phone in record.phones)
+                if record.birthday:
+                    lines.append(f"BDAY:{record.birthday.value.isoformat()}")
+                lines.append("END:VCARD")
+                f.write("\r\n".join(lines) + "\r\n")
+                count += 1
+        else:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for record in book.values():
+                phones = ", ".join(str(phone) for phone in record.phones)
+                writer.writerow([str(record.name), phones, str(record.birthday) if record.birthday else ""])
+                count += 1
+    return count
@@ -0,0 +1,164 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple, Union
+from address_book import AddressBook
+from mmap_book import iter_raw
+from record import Record
+from search import normalize_name
+
+NAME = "name"
+PHONE = "phone"
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+class DuplicateGroup:
+    """
+    Contacts that share a blocking key, directly or through each other.
+
+    Attributes:
+        names (List[str]): The contact names in book order.
+        matched_on (Set[str]): NAME and/or PHONE, the kinds of keys that linked them.
+    """
+
+    __slots__ = ("names", "matched_on")
+
+    def __init__(self, names: List[str], matched_on: Set[str]):
+        self.names = names
+        self.matched_on = matched_on
+
+    @property
+    def same_name(self) -> bool:
+        """
+        Whether every contact of the group has the same name key.
+
+        Groups linked only through shared phones may be different people,
+        such as a family or an office sharing a number.
+        """
+        keys = {name_key(name) for name in self.names}
+        return len(keys) == 1 and "" not in keys
+
+
+def name_key(name: str) -> str:
+    """
+    Normalizes a name into a blocking key.
+
+    Names differing only in case, in the keyboard layout they were typed in,
+    in punctuation and spacing, or in word order get the same key.
+
+    Args:
+        name (str): The contact name.
+
+    Returns:
+        str: The key, empty for a name without letters or digits.
+    """
+    if name.isascii() and name.isalnum():
+        # Nothing to transliterate or split.
+        return name.lower()
+    normalized = normalize_name(name)
+    if normalized.isalnum():
+        return normalized
+    return "".join(sorted(_SEPARATORS.split(normalized)))
+
+
+def find_duplicates(contacts: Iterable[Tuple[str, Iterable[int]]]) -> List[DuplicateGroup]:
+    """
+    Finds candidate duplicates in a single pass over the contacts.
+
+    Every contact is looked up by its blocking keys, the name key and each
+    packed phone number. A key seen before links the contact to the first one
+    that had it, and linked contacts are merged into groups with a
+    union-find, so the work grows linearly with the number of contacts
+    instead of comparing every pair.
+
+    Args:
+        contacts (Iterable[Tuple[str, Iterable[int]]]): The name and packed phones of every contact.
+
+    Returns:
+        List[DuplicateGroup]: The groups of two or more contacts, ordered by their first member.
+    """
+    names: List[str] = []
+    parent: List[int] = []
+    first_seen: Dict[Union[str, int], int] = {}
+    links: List[Tuple[int, int, str]] = []
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def link(other: int, i: int, kind: str) -> None:
+        links.append((other, i, kind))
+        root, other_root = find(other), find(i)
+        if root != other_root:
+            parent[max(root, other_root)] = min(root, other_root)
+
+    seen = first_seen.setdefault
+    for i, (name, phones) in enumerate(contacts):
+        names.append(name)
+        parent.append(i)
+        key = name_key(name)
+        if key:
+            other = seen(key, i)
+            if other != i:
+                link(other, i, NAME)
+        for phone in phones:
+            other = seen(phone, i)
+            if other != i:
+                link(other, i, PHONE)
+
+    members: Dict[int, Set[int]] = {}
+    matched_on: Dict[int, Set[str]] = {}
+    for a, b, kind in links:
+        root = find(a)
+        members.setdefault(root, set()).update((a, b))
+        matched_on.setdefault(root, set()).add(kind)
+    return [DuplicateGroup([names[i] for i in sorted(members[root])], matched_on[root])
+            for root in sorted(members)]
+
+
+def find_book_duplicates(book: AddressBook) -> List[DuplicateGroup]:
+    """
+    Finds candidate duplicates in an address book.
+
+    Args:
+        book (AddressBook): The address book.
+
+    Returns:
+        List[DuplicateGroup]: The groups in book order.
+    """
+    return find_duplicates((name, phones) for name, phones, _ in iter_raw(book))
+
+
+def merge(book: AddressBook, names: List[str]) -> Record:
+    """
+    Merges contacts into the first one and deletes the others.
+
+    The kept contact gains the phones it lacks and, if it has no birthday,
+    the birthday of the others.
+
+    Args:
+        book (AddressBook): The address book.
+        names (List[str]): The names of the contacts, the one to keep first.
+
+    Returns:
+        Record: The kept record.
+
+    Raises:
+        ValueError: If a contact is missing or the contacts have different birthdays.
+    """
+    with book.locked():
+        records = [book.find(name) for name in names]
+        if any(record is None for record in records):
+            raise ValueError("Contact not found.")
+        birthdays = {str(record.birthday) for record in records if record.birthday}
+        if len(birthdays) > 1:
+            raise ValueError(f"Contacts {', '.join(names)} have different birthdays.")
+        kept, *others = records
+        for record in others:
+            for phone in record.phones:
+                if kept.find_phone(phone.value) is None:
+                    kept.add_phone(phone.value)
+            if kept.birthday is None and record.birthday:
+                kept.add_birthday(str(record.birthday))
+            book.delete(record.name.value)
+    return kept
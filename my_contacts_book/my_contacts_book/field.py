@@ -1,6 +1,34 @@
 class Field:
+    """
+    Base class for record fields.
+
+    Fields use __slots__ and keep their data in a single `_value` slot, so
+    subclasses can store a packed representation behind the `value` property.
+    Pickles hold just that packed value.
+    """
+
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self.value = value
 
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def __getstate__(self):
+        return self._value
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # Books pickled before fields used __slots__.
+            self.value = state["value"]
+        else:
+            self._value = state
+
     def __str__(self):
-        return str(self.value)
\ No newline at end of file
+        return str(self.value)
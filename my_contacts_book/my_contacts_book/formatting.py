@@ -0,0 +1,169 @@
+import json
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Sequence
+from unicodedata import combining, east_asian_width
+from colorama import Fore, Style
+
+TABLE = "table"
+PLAIN = "plain"
+JSON = "json"
+OUTPUT_MODES = (TABLE, PLAIN, JSON)
+STREAM_CHUNK_SIZE = 500
+WIDTH_SAMPLE_SIZE = 1000
+
+# How handlers render tabular results: bordered tables for people, or
+# tab-separated text or JSON for programs. Messages are not affected.
+mode = TABLE
+
+
+def set_mode(new_mode: str) -> None:
+    """
+    Selects how tabular results are rendered.
+
+    Args:
+        new_mode (str): One of OUTPUT_MODES.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    global mode
+    if new_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode {new_mode}, use one of {', '.join(OUTPUT_MODES)}.")
+    mode = new_mode
+
+
+def render(field_names: List[str], rows: Sequence[Sequence[str]], footer: str = "") -> str:
+    """
+    Renders rows in the current output mode.
+
+    Args:
+        field_names (List[str]): The column headers.
+        rows (Sequence[Sequence[str]]): The rows, one string per column.
+        footer (str): A line shown under a table or plain text; JSON omits it.
+
+    Returns:
+        str: The rendered result.
+    """
+    # Large enough for a single chunk with the header, borders and footer.
+    chunk_size = len(rows) + 5
+    if mode == TABLE:
+        table = "".join(stream_table(field_names, rows, footer, len(rows), chunk_size)).rstrip("\n")
+        return f"{Fore.BLUE}{table}{Style.RESET_ALL}"
+    return "".join(stream(field_names, rows, footer, chunk_size=chunk_size)).rstrip("\n")
+
+
+def stream(field_names: List[str], rows: Iterable[Sequence[str]], footer: str = "",
+           sample_size: int = WIDTH_SAMPLE_SIZE, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Renders rows in the current output mode chunk by chunk.
+
+    Args:
+        field_names (List[str]): The column headers.
+        rows (Iterable[Sequence[str]]): The rows, produced lazily.
+        footer (str): A line shown under a table or plain text; JSON omits it.
+        sample_size (int): The number of rows used to compute table column widths.
+        chunk_size (int): The number of rows per yielded chunk.
+
+    Returns:
+        Iterator[str]: Consecutive parts of the result, each ending with a newline.
+    """
+    if mode == JSON:
+        chunks = _json_chunks(field_names, rows, chunk_size)
+    elif mode == PLAIN:
+        chunks = _plain_chunks(field_names, rows, footer, chunk_size)
+    else:
+        chunks = (f"{Fore.BLUE}{chunk}{Style.RESET_ALL}"
+                  for chunk in stream_table(field_names, rows, footer, sample_size, chunk_size))
+    return chunks
+
+
+def stream_table(field_names: List[str], rows: Iterable[Sequence[str]], footer: str = "",
+                 sample_size: int = WIDTH_SAMPLE_SIZE, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Formats rows as a PrettyTable-style table chunk by chunk.
+
+    Column widths are taken from the first `sample_size` rows; a longer value
+    further down is written in full and only shifts the borders of its row.
+
+    Args:
+        field_names (List[str]): The column headers.
+        rows (Iterable[Sequence[str]]): The rows, produced lazily.
+        footer (str): A line written under the table.
+        sample_size (int): The number of rows used to compute column widths.
+        chunk_size (int): The number of rows per yielded chunk.
+
+    Yields:
+        str: Consecutive parts of the table, each ending with a newline.
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    widths = [max([display_width(name)] + [display_width(row[i]) for row in sample])
+              for i, name in enumerate(field_names)]
+    border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+
+    def line(values: Sequence[str]) -> str:
+        return "| " + " | ".join(_center(value, width) for value, width in zip(values, widths)) + " |"
+
+    chunk = [border, line(field_names), border]
+    for row in chain(sample, rows):
+        chunk.append(line(row))
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    chunk.append(border)
+    if footer:
+        chunk.append(footer)
+    yield "\n".join(chunk) + "\n"
+
+
+def display_width(text: str) -> int:
+    """
+    Returns the number of terminal columns a string occupies.
+
+    Wide East Asian characters take two columns and combining marks none.
+    """
+    if text.isascii():
+        return len(text)
+    return sum(0 if combining(char) else 2 if east_asian_width(char) in "WF" else 1 for char in text)
+
+
+def _center(text: str, width: int) -> str:
+    padding = width - display_width(text)
+    if padding <= 0:
+        return text
+    if len(text) == display_width(text):
+        return text.center(width)
+    # str.center counts code points; pad by columns the same way it does.
+    left = padding // 2 + (padding & width & 1)
+    return " " * left + text + " " * (padding - left)
+
+
+def _plain_chunks(field_names: List[str], rows: Iterable[Sequence[str]], footer: str,
+                  chunk_size: int) -> Iterator[str]:
+    chunk = ["\t".join(field_names)]
+    for row in rows:
+        chunk.append("\t".join(row))
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if footer:
+        chunk.append(footer)
+    yield "\n".join(chunk) + "\n"
+
+
+def _json_chunks(field_names: List[str], rows: Iterable[Sequence[str]], chunk_size: int) -> Iterator[str]:
+    keys = [name.lower().replace(" ", "_") for name in field_names]
+    chunk = ["["]
+    previous = None
+    for row in rows:
+        if previous is not None:
+            # A row gets its comma only once the next one is known to exist.
+            chunk.append(previous + ",")
+            if len(chunk) >= chunk_size:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        previous = "  " + json.dumps(dict(zip(keys, row)), ensure_ascii=False)
+    if previous is not None:
+        chunk.append(previous)
+    chunk.append("]")
+    yield "\n".join(chunk) + "\n"
@@ -1,10 +1,19 @@
 from functools import wraps
-from typing import List
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Union
 from address_book import AddressBook
-from birthday import Birthday
+from birthday import format_birthday
+import formatting
+import instrumentation
 from record import Record
 from colorama import Fore, Style
-from prettytable import PrettyTable
+
+# Books with more contacts than this are streamed by the all command.
+STREAM_THRESHOLD = 1000
+CONTACT_FIELDS = ["Name", "Phones", "Birthday"]
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_BIRTHDAY_WINDOW = 7
+MAX_BIRTHDAY_WINDOW = 366
 
 def input_error(func):
     """
@@ -21,6 +30,8 @@ def input_error(func):
         try:
             return func(*args, **kwargs)
         except (KeyError, ValueError, IndexError) as e:
+            if instrumentation.enabled:
+                instrumentation.record_error(func.__name__)
             return f"{Fore.YELLOW}Error: {str(e)}{Style.RESET_ALL}"
     return inner
 
@@ -45,7 +56,7 @@ def add_contact(args: List[str], book: AddressBook) -> str:
     birthday = optional_args[0] if optional_args else None
     
     existing_record = book.find(name)
-    if existing_record and any(phone == p.value for p in existing_record.phones):
+    if existing_record and any(record is existing_record for record in book.find_by_phone(phone)):
         return f"{Fore.YELLOW}Contact with this name and phone number already exists.{Style.RESET_ALL}"
     
     if existing_record:
@@ -114,34 +125,101 @@ def show_phone(args: List[str], book: AddressBook) -> str:
     name = args[0].capitalize()
     record = book.find(name)
     if record:
-        table = PrettyTable()
-        table.field_names = ["Name", "Phones"]
-        phones = ", ".join([str(phone) for phone in record.phones])
-        table.add_row([name, phones])
-        return f"{Fore.BLUE}{table}{Style.RESET_ALL}"
+        return formatting.render(["Name", "Phones"], [record.fields()[:2]])
     return f"{Fore.YELLOW}Contact not found.{Style.RESET_ALL}"
 
 @input_error
-def show_all(book: AddressBook) -> str:
+def show_phone_owner(args: List[str], book: AddressBook) -> str:
     """
-    Shows all contacts in the address book.
+    Shows the contacts that own the specified phone number.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    if len(args) != 1:
+        raise ValueError("Error: Give me phone, please.")
+
+    phone = args[0]
+    records = book.find_by_phone(phone)
+    if records:
+        return formatting.render(["Name", "Phones"], [record.fields()[:2] for record in records])
+    return f"{Fore.YELLOW}No contact with this phone number.{Style.RESET_ALL}"
+
+@input_error
+def search_contacts(args: List[str], book: AddressBook) -> str:
+    """
+    Searches contacts by name prefix or similar names.
 
     Args:
+        args (List[str]): The arguments for the command.
         book (AddressBook): The address book instance.
 
     Returns:
         str: The response message.
     """
+    if len(args) != 1:
+        raise ValueError("Error: Give me part of the name, please.")
+
+    records = book.search(args[0])
+    if not records:
+        return f"{Fore.YELLOW}No matching contacts.{Style.RESET_ALL}"
+    return formatting.render(CONTACT_FIELDS, [record.fields() for record in records])
+
+@input_error
+def show_all(args: List[str], book: AddressBook) -> Union[str, Iterator[str]]:
+    """
+    Shows all contacts in the address book.
+
+    With `--page N` (and optionally `--size K`) only that page is shown.
+    Books larger than STREAM_THRESHOLD are streamed as chunks of formatted
+    rows instead of one table, so output starts immediately.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        Union[str, Iterator[str]]: The response message, or its chunks when streaming.
+    """
     if not book:
         return f"{Fore.YELLOW}The address book is empty.{Style.RESET_ALL}"
-    
-    table = PrettyTable()
-    table.field_names = ["Name", "Phones", "Birthday"]
-    for record in book.values():
-        phones = ", ".join([str(phone) for phone in record.phones])
-        birthday = str(record.birthday) if record.birthday else ""
-        table.add_row([record.name, phones, birthday])
-    return f"{Fore.BLUE}{table}{Style.RESET_ALL}"
+
+    page, size = _parse_page_args(args)
+    book = book.snapshot()
+    if page is not None:
+        pages = max(1, -(-len(book) // size))
+        if page > pages:
+            raise ValueError(f"Error: There are only {pages} pages.")
+        rows = [record.fields() for record in islice(book.values(), (page - 1) * size, page * size)]
+        return formatting.render(CONTACT_FIELDS, rows, footer=f"Page {page} of {pages}")
+
+    if len(book) > STREAM_THRESHOLD:
+        return formatting.stream(CONTACT_FIELDS, (record.fields() for record in book.values()))
+
+    return formatting.render(CONTACT_FIELDS, [record.fields() for record in book.values()])
+
+def _parse_page_args(args: List[str]) -> Tuple[Optional[int], int]:
+    """
+    Parses `--page N` and `--size K` options of the all command.
+
+    Returns:
+        Tuple[Optional[int], int]: The page number (None when not paging) and the page size.
+    """
+    options = {"--page": None, "--size": None}
+    remaining = list(args)
+    while remaining:
+        option = remaining.pop(0)
+        if option not in options or not remaining or not remaining[0].isdigit() or int(remaining[0]) < 1:
+            raise ValueError("Error: Use all [--page N] [--size K] with positive numbers.")
+        options[option] = int(remaining.pop(0))
+    page, size = options["--page"], options["--size"]
+    if size is not None and page is None:
+        page = 1
+    return page, size or DEFAULT_PAGE_SIZE
 
 @input_error
 def delete_contact(args: List[str], book: AddressBook) -> str:
@@ -206,11 +284,8 @@ def show_birthday(args: List[str], book: AddressBook) -> str:
     name = args[0].capitalize()
     record = book.find(name)
     if record:
-        table = PrettyTable()
-        table.field_names = ["Name", "Birthday"]
-        birthday = str(record.birthday) if record.birthday else "No birthday set"
-        table.add_row([name, birthday])
-        return f"{Fore.BLUE}{table}{Style.RESET_ALL}"
+        name, _, birthday = record.fields()
+        return formatting.render(["Name", "Birthday"], [(name, birthday or "No birthday set")])
     return f"{Fore.YELLOW}Contact not found.{Style.RESET_ALL}"
 
 @input_error
@@ -234,7 +309,7 @@ def change_birthday(args: List[str], book: AddressBook) -> str:
 
     if record:
         if record.birthday:
-            record.birthday = Birthday(new_birthday)
+            record.add_birthday(new_birthday)
             return f"{Fore.GREEN}Birthday updated.{Style.RESET_ALL}" 
         else:
             return f"{Fore.YELLOW}Contact has no existing birthday to update.{Style.RESET_ALL}" 
@@ -243,7 +318,34 @@ def change_birthday(args: List[str], book: AddressBook) -> str:
 @input_error
 def birthdays(args: List[str], book: AddressBook) -> str:
     """
-    Shows upcoming birthdays within the next 7 days.
+    Shows upcoming birthdays within the next `days` days (7 by default).
+
+    Contacts are listed by congratulation date; birthdays falling on a
+    weekend are congratulated on the following Monday.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    if len(args) > 1 or (args and not (args[0].isdigit() and int(args[0]) <= MAX_BIRTHDAY_WINDOW)):
+        raise ValueError(f"Error: Use birthdays [days] with a number of days from 0 to {MAX_BIRTHDAY_WINDOW}.")
+    days = int(args[0]) if args else DEFAULT_BIRTHDAY_WINDOW
+    upcoming = book.upcoming_congratulations(days)
+    if not upcoming:
+        return f"{Fore.YELLOW}No birthdays in the next {days} days.{Style.RESET_ALL}"
+    rows = []
+    for day, record in upcoming:
+        name, phones, birthday = record.fields()
+        rows.append((name, birthday, f"{day.strftime('%a')} {format_birthday(day)}", phones))
+    return formatting.render(["Name", "Birthday", "Congratulate on", "Phones"], rows)
+
+@input_error
+def import_file(args: List[str], book: AddressBook) -> str:
+    """
+    Imports contacts from a CSV or vCard file.
 
     Args:
         args (List[str]): The arguments for the command.
@@ -252,12 +354,191 @@ def birthdays(args: List[str], book: AddressBook) -> str:
     Returns:
         str: The response message.
     """
-    upcoming_birthdays = book.get_upcoming_birthdays()
-    if not upcoming_birthdays:
-        return f"{Fore.YELLOW}No birthdays in the next 7 days.{Style.RESET_ALL}"
-    table = PrettyTable()
-    table.field_names = ["Name", "Birthday", "Phones"]
-    for record in upcoming_birthdays:
-        phones = ", ".join([str(phone) for phone in record.phones])
-        table.add_row([record.name, record.birthday, phones])
-    return f"{Fore.BLUE}{table}{Style.RESET_ALL}"
\ No newline at end of file
+    if len(args) == 3 and args[1] == "--workers" and args[2].isdigit():
+        workers = int(args[2])
+    elif len(args) == 1:
+        workers = 0
+    else:
+        raise ValueError("Error: Give me the file name and optionally --workers N, please.")
+
+    import csv
+    from contacts_io import import_contacts
+    try:
+        imported, rejected = import_contacts(args[0], book, workers=workers)
+    except FileNotFoundError:
+        return f"{Fore.YELLOW}File not found.{Style.RESET_ALL}"
+    except (OSError, csv.Error, ValueError) as e:
+        # Contacts read before the failure stay imported.
+        raise ValueError(f"Error: Cannot import {args[0]}: {e}")
+    if rejected:
+        return (f"{Fore.GREEN}Imported {imported} contacts.{Style.RESET_ALL} "
+                f"{Fore.YELLOW}{rejected} rejected, see {args[0]}.rejects.csv{Style.RESET_ALL}")
+    return f"{Fore.GREEN}Imported {imported} contacts.{Style.RESET_ALL}"
+
+@input_error
+def export_file(args: List[str], book: AddressBook) -> str:
+    """
+    Exports all contacts to a CSV or vCard file.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    if len(args) != 1:
+        raise ValueError("Error: Give me the file name, please.")
+
+    from contacts_io import export_contacts
+    try:
+        count = export_contacts(args[0], book)
+    except OSError as e:
+        raise ValueError(f"Error: Cannot export {args[0]}: {e}")
+    return f"{Fore.GREEN}Exported {count} contacts.{Style.RESET_ALL}"
+
+@input_error
+def dedupe_contacts(args: List[str], book: AddressBook) -> str:
+    """
+    Reports groups of likely duplicate contacts, or merges them.
+
+    `dedupe` lists the groups; `dedupe merge` merges every group whose
+    contacts have the same name and `dedupe merge N ...` the listed groups,
+    including those linked only by shared phones. Each group is merged into
+    its first contact; groups whose contacts have different birthdays are skipped.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    from dedupe import find_book_duplicates, merge
+    if args and (args[0] != "merge" or not all(arg.isdigit() for arg in args[1:])):
+        raise ValueError("Error: Use dedupe, or dedupe merge [group ...] with group numbers from the report.")
+    groups = find_book_duplicates(book)
+    if not groups:
+        return f"{Fore.GREEN}No duplicates found.{Style.RESET_ALL}"
+
+    if not args:
+        rows = []
+        for number, group in enumerate(groups, 1):
+            matched_on = ", ".join(sorted(group.matched_on))
+            for name in group.names:
+                rows.append((str(number), *book.find(name).fields(), matched_on))
+        footer = f"{len(groups)} groups. Merge them with dedupe merge [group ...]."
+        return formatting.render(["Group", "Name", "Phones", "Birthday", "Matched on"], rows, footer=footer)
+
+    numbers = [int(arg) for arg in args[1:]]
+    if any(not 1 <= number <= len(groups) for number in numbers):
+        raise ValueError(f"Error: There are only {len(groups)} groups.")
+    unconfirmed = []
+    if not numbers:
+        # Different names sharing a phone may be different people, so those
+        # groups are only merged when they are listed.
+        for number, group in enumerate(groups, 1):
+            (numbers if group.same_name else unconfirmed).append(number)
+    merged, skipped = 0, []
+    for number in numbers:
+        try:
+            merge(book, groups[number - 1].names)
+            merged += 1
+        except ValueError:
+            skipped.append(str(number))
+    response = f"{Fore.GREEN}Merged {merged} groups.{Style.RESET_ALL}"
+    if skipped:
+        response += f" {Fore.YELLOW}Skipped groups with different birthdays: {', '.join(skipped)}.{Style.RESET_ALL}"
+    if unconfirmed:
+        listed = " ".join(map(str, unconfirmed))
+        response += (f" {Fore.YELLOW}Groups with different names were not merged; merge them with "
+                     f"dedupe merge {listed}.{Style.RESET_ALL}")
+    return response
+
+
+@input_error
+def undo_changes(args: List[str], book: AddressBook) -> str:
+    """
+    Reverts the changes of the last command, or of the last N commands.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    history = _history(book)
+    labels = []
+    for _ in range(_step_count(args, "undo")):
+        label = history.undo()
+        if label is None:
+            break
+        labels.append(label)
+    if not labels:
+        return f"{Fore.YELLOW}Nothing to undo.{Style.RESET_ALL}"
+    return f"{Fore.GREEN}Undone: {'; '.join(labels)}.{Style.RESET_ALL}"
+
+
+@input_error
+def redo_changes(args: List[str], book: AddressBook) -> str:
+    """
+    Reapplies the changes of the last undone command, or of the last N undone commands.
+
+    Args:
+        args (List[str]): The arguments for the command.
+        book (AddressBook): The address book instance.
+
+    Returns:
+        str: The response message.
+    """
+    history = _history(book)
+    labels = []
+    for _ in range(_step_count(args, "redo")):
+        label = history.redo()
+        if label is None:
+            break
+        labels.append(label)
+    if not labels:
+        return f"{Fore.YELLOW}Nothing to redo.{Style.RESET_ALL}"
+    return f"{Fore.GREEN}Redone: {'; '.join(labels)}.{Style.RESET_ALL}"
+
+
+def _history(book: AddressBook):
+    if book.history is None:
+        raise ValueError("Error: Undo and redo are only available in an interactive session.")
+    return book.history
+
+
+def _step_count(args: List[str], command: str) -> int:
+    if args and not (args[0].isdigit() and int(args[0]) >= 1):
+        raise ValueError(f"Error: Use {command} [count] with a positive number.")
+    return int(args[0]) if args else 1
+
+def show_stats(args: List[str]) -> str:
+    """
+    Shows per-command latency statistics collected with --stats or --profile.
+
+    `stats reset` clears them and `stats profile` shows the cProfile and
+    tracemalloc report collected with --profile.
+
+    Args:
+        args (List[str]): The arguments for the command.
+
+    Returns:
+        str: The response message.
+    """
+    if not instrumentation.enabled:
+        return f"{Fore.YELLOW}Statistics are off. Start the bot with --stats or --profile to collect them.{Style.RESET_ALL}"
+    if args == ["reset"]:
+        instrumentation.reset()
+        return f"{Fore.GREEN}Statistics cleared.{Style.RESET_ALL}"
+    if args == ["profile"]:
+        return instrumentation.profile_report() or f"{Fore.YELLOW}Profiling is off. Start the bot with --profile.{Style.RESET_ALL}"
+    rows = instrumentation.summary()
+    if not rows:
+        return f"{Fore.YELLOW}No commands measured yet.{Style.RESET_ALL}"
+    errors = ", ".join(f"{handler} {count}" for handler, count in sorted(instrumentation.errors().items()))
+    footer = f"Input errors: {errors}" if errors else ""
+    return formatting.render(["Command", "Phase", "Count", "Mean ms", "p50 ms", "p90 ms", "p99 ms", "Max ms"],
+                             [[str(value) for value in row] for row in rows], footer=footer)
@@ -0,0 +1,138 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from address_book import AddressBook
+from journal import apply_event
+from record import Record
+
+# An undo step: its label and, per contact it touched, the event that
+# restores the contact's state from before the step.
+Step = Tuple[str, Dict[str, tuple]]
+
+
+class History:
+    """
+    Undo and redo history of an address book.
+
+    The history is a log of inverse operations rather than a series of book
+    copies. Just before a contact changes, the book reports its current
+    state, and the history keeps the event that brings it back: an "add"
+    event with the old phones and birthday, or a "delete" event for a
+    contact that did not exist. Only the first state of each contact in a
+    step is kept, so a step costs memory in proportion to the contacts it
+    touched, whatever the size of the book, and undoing it replays one event
+    per contact. The events are applied through the book like any edit, so
+    indexes, caches and the journal stay in sync, and the state they
+    overwrite becomes the matching redo step.
+
+    Attributes:
+        book (AddressBook): The address book.
+        max_steps (int): The number of steps kept for undo; older ones are dropped.
+    """
+
+    def __init__(self, book: AddressBook, max_steps: int = 100):
+        """
+        Starts recording the changes of an address book.
+
+        Args:
+            book (AddressBook): The address book to record.
+            max_steps (int): The number of steps kept for undo.
+        """
+        self.book = book
+        self.max_steps = max_steps
+        self._undo: Deque[Step] = deque(maxlen=max_steps)
+        self._redo: List[Step] = []
+        self._target: Optional[Dict[str, tuple]] = None
+        self._pending: Optional[Tuple[str, tuple]] = None
+        book.history = self
+        book.subscribe_before(self._before_change)
+        book.subscribe(self._on_change)
+
+    @contextmanager
+    def step(self, label: str) -> Iterator[None]:
+        """
+        Groups the changes made inside the block into a single undo step.
+
+        A block that changes nothing leaves the history as it was; otherwise
+        the redo steps are discarded. Nested blocks belong to the outer step.
+
+        Args:
+            label (str): Describes the step, e.g. the command line that made it.
+        """
+        if self._target is not None:
+            yield
+            return
+        self._target = {}
+        try:
+            yield
+        finally:
+            inverses, self._target = self._target, None
+            self._pending = None
+            if inverses:
+                self._undo.append((label, inverses))
+                self._redo.clear()
+
+    def undo(self) -> Optional[str]:
+        """
+        Reverts the most recent step.
+
+        Returns:
+            Optional[str]: The label of the reverted step, or None if there is nothing to undo.
+        """
+        if not self._undo:
+            return None
+        label, inverses = self._undo.pop()
+        self._redo.append((label, self._restore(inverses)))
+        return label
+
+    def redo(self) -> Optional[str]:
+        """
+        Reapplies the most recently undone step.
+
+        Returns:
+            Optional[str]: The label of the reapplied step, or None if there is nothing to redo.
+        """
+        if not self._redo:
+            return None
+        label, inverses = self._redo.pop()
+        self._undo.append((label, self._restore(inverses)))
+        return label
+
+    def close(self) -> None:
+        """
+        Stops recording and detaches the history from the book.
+        """
+        self.book.unsubscribe_before(self._before_change)
+        self.book.unsubscribe(self._on_change)
+        self.book.history = None
+
+    def _restore(self, inverses: Dict[str, tuple]) -> Dict[str, tuple]:
+        outer, self._target = self._target, {}
+        try:
+            for inverse in inverses.values():
+                apply_event(self.book, *inverse)
+            return self._target
+        finally:
+            self._target, self._pending = outer, None
+
+    def _before_change(self, name: str, record: Optional[Record]) -> None:
+        if self._target is not None and name in self._target:
+            return
+        if record is None:
+            inverse = ("delete", name)
+        else:
+            birthday = str(record.birthday) if record.birthday else None
+            inverse = ("add", name, [phone.value for phone in record.phones], birthday)
+        self._pending = (name, inverse)
+
+    def _on_change(self, op: str, name: str, *args) -> None:
+        # Edits that turn out to change nothing report a state but no event,
+        # so a state only counts once the event for the same contact follows.
+        pending, self._pending = self._pending, None
+        if pending is None or pending[0] != name:
+            return
+        if self._target is not None:
+            self._target.setdefault(name, pending[1])
+        else:
+            self._undo.append((op, {name: pending[1]}))
+            self._redo.clear()
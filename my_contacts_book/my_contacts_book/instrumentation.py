@@ -0,0 +1,183 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Tuple
+
+# Whether timings are collected. Instrumented code checks this flag first,
+# so disabled instrumentation costs one function call per timed block.
+enabled = False
+PERSISTENCE = "persistence"
+_DISABLED = nullcontext()
+_BUCKETS = 40
+
+
+class Histogram:
+    """
+    Latency histogram with power-of-two microsecond buckets.
+
+    Bucket i counts samples shorter than 2**i microseconds, so percentiles
+    are reported as bucket upper bounds; count, total, min and max are exact.
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """
+        Records one sample.
+
+        Args:
+            seconds (float): The measured duration.
+        """
+        self.buckets[min(_BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Returns the upper bound in seconds of the bucket holding a percentile.
+
+        Args:
+            fraction (float): The percentile as a fraction, e.g. 0.99.
+
+        Returns:
+            float: The approximate percentile, capped at the exact maximum.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if bucket and seen >= rank:
+                return min(self.max, (1 << i) / 1e6)
+        return self.max
+
+
+_histograms: Dict[Tuple[str, str], Histogram] = {}
+_errors: Dict[str, int] = {}
+_profiler = None
+
+
+def enable(profile: bool = False) -> None:
+    """
+    Starts collecting per-command timings, and optionally a cProfile and tracemalloc profile.
+
+    Args:
+        profile (bool): Whether to also profile calls and memory allocations.
+    """
+    global enabled, _profiler
+    enabled = True
+    if profile and _profiler is None:
+        # The profiling modules add tens of milliseconds to start-up, so they
+        # are only imported when profiling is requested.
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def reset() -> None:
+    """
+    Clears the collected timings and error counts.
+    """
+    _histograms.clear()
+    _errors.clear()
+
+
+def record(command: str, phase: str, seconds: float) -> None:
+    """
+    Records the duration of a phase of a command.
+
+    Args:
+        command (str): The command, or PERSISTENCE for storage operations.
+        phase (str): The phase, e.g. parse, suggest, handler or render.
+        seconds (float): The measured duration.
+    """
+    histogram = _histograms.get((command, phase))
+    if histogram is None:
+        histogram = _histograms[command, phase] = Histogram()
+    histogram.add(seconds)
+
+
+def record_error(handler: str) -> None:
+    """
+    Counts a handler call that ended with an input error.
+    """
+    _errors[handler] = _errors.get(handler, 0) + 1
+
+
+def errors() -> Dict[str, int]:
+    """
+    Returns the input error counts by handler name.
+    """
+    return dict(_errors)
+
+
+def timer(command: str, phase: str) -> ContextManager:
+    """
+    Returns a context manager timing its block as a phase of a command, or a no-op when disabled.
+
+    Args:
+        command (str): The command, or PERSISTENCE for storage operations.
+        phase (str): The phase name.
+    """
+    return _timed(command, phase) if enabled else _DISABLED
+
+
+@contextmanager
+def _timed(command: str, phase: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(command, phase, time.perf_counter() - started)
+
+
+def summary() -> List[list]:
+    """
+    Summarizes the collected timings.
+
+    Returns:
+        List[list]: One row per command and phase: command, phase, count,
+        then mean, p50, p90, p99 and max in milliseconds.
+    """
+    rows = []
+    for (command, phase), histogram in sorted(_histograms.items()):
+        rows.append([command, phase, histogram.count,
+                     *(f"{seconds * 1e3:.3f}" for seconds in (
+                         histogram.total / histogram.count, histogram.percentile(0.5),
+                         histogram.percentile(0.9), histogram.percentile(0.99), histogram.max))])
+    return rows
+
+
+def profile_report(limit: int = 25) -> str:
+    """
+    Formats the cProfile and tracemalloc results collected since enable(profile=True).
+
+    Args:
+        limit (int): The number of functions and allocation sites to list.
+
+    Returns:
+        str: The report, or an empty string when profiling is off.
+    """
+    if _profiler is None:
+        return ""
+    import io
+    import pstats
+    import tracemalloc
+    _profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(_profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    _profiler.enable()
+    current, peak = tracemalloc.get_traced_memory()
+    out.write(f"Memory: {current / 1e6:.1f} MB allocated now, {peak / 1e6:.1f} MB at peak\n")
+    for stat in tracemalloc.take_snapshot().statistics("lineno")[:limit]:
+        out.write(f"{stat}\n")
+    return out.getvalue()
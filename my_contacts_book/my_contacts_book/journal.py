@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+from typing import Callable, List, Optional
+from address_book import AddressBook
+from atomic_file import atomic_write
+import instrumentation
+from record import Record
+
+
+def journal_paths(filename: str) -> tuple[str, str]:
+    """
+    Returns the paths of the active and the rotated journal for a snapshot file.
+
+    Args:
+        filename (str): The snapshot filename.
+
+    Returns:
+        tuple[str, str]: The active journal path and the rotated journal path.
+    """
+    return f"{filename}.journal", f"{filename}.journal.old"
+
+
+def pickle_snapshot(book: AddressBook) -> bytes:
+    """
+    Serializes an address book as a pickle snapshot.
+
+    Args:
+        book (AddressBook): The address book to serialize.
+
+    Returns:
+        bytes: The pickled book.
+    """
+    import pickle
+    chunks = _Chunks()
+    pickle.Pickler(chunks, protocol=pickle.HIGHEST_PROTOCOL).dump(book.snapshot())
+    return b"".join(chunks)
+
+
+class _Chunks(list):
+    # The pickler hands every finished frame to write(); a Python-level
+    # write lets other threads run in between instead of waiting for the GIL
+    # until the whole book is pickled.
+    def write(self, data: bytes) -> None:
+        self.append(data)
+
+
+def apply_event(book: AddressBook, op: str, name: str, *args) -> None:
+    """
+    Applies a single mutation event to the address book.
+
+    Args:
+        book (AddressBook): The address book to change.
+        op (str): The event operation, as emitted by AddressBook.
+        name (str): The contact name the event refers to.
+        *args: The operation arguments.
+    """
+    if op == "add":
+        phones, birthday = args
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        if birthday:
+            record.add_birthday(birthday)
+        book[name] = record
+    elif op == "delete":
+        book.delete(name)
+    else:
+        record = book.find(name)
+        if record is None:
+            return
+        if op == "add_phone":
+            record.add_phone(*args)
+        elif op == "remove_phone":
+            record.remove_phone(*args)
+        elif op == "edit_phone":
+            record.edit_phone(*args)
+        elif op == "set_birthday":
+            record.add_birthday(*args)
+
+
+def replay(book: AddressBook, filename: str) -> int:
+    """
+    Replays the journal tail written after the snapshot was taken.
+
+    Entries already contained in the snapshot are skipped by sequence number,
+    and replay stops at the first torn or corrupt line.
+
+    Args:
+        book (AddressBook): The address book loaded from the snapshot.
+        filename (str): The snapshot filename.
+
+    Returns:
+        int: The sequence number of the last applied entry.
+    """
+    last_seq = book.journal_seq
+    active, rotated = journal_paths(filename)
+    for path in (rotated, active):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        seq, *event = json.loads(line)
+                    except ValueError:
+                        break
+                    if seq > last_seq:
+                        apply_event(book, *event)
+                        last_seq = seq
+        except FileNotFoundError:
+            continue
+    book.journal_seq = last_seq
+    return last_seq
+
+
+class Journal:
+    """
+    Append-only write-ahead journal for an address book.
+
+    Every mutation event of the book is appended as a JSON line and fsynced in
+    groups, either every `commit_interval` seconds by a background thread or
+    as soon as `batch_size` entries are pending. Once `compact_every` entries
+    have been written, the journal is rotated and a copy-on-write snapshot of
+    the book is taken; serializing it and writing it to disk happen in the
+    background, so edits continue meanwhile. The book is switched to
+    thread-safe mode for that.
+
+    Attributes:
+        book (AddressBook): The journaled address book.
+        filename (str): The snapshot filename.
+    """
+
+    def __init__(self, book: AddressBook, filename: str = "addressbook.pkl",
+                 commit_interval: float = 0.2, batch_size: int = 256, compact_every: int = 10000,
+                 dump: Callable[[AddressBook], bytes] = pickle_snapshot):
+        """
+        Opens the journal and starts the group-commit thread.
+
+        Args:
+            book (AddressBook): The address book to journal.
+            filename (str): The snapshot filename.
+            commit_interval (float): The maximum time in seconds an entry waits for fsync.
+            batch_size (int): The number of pending entries that forces an immediate commit.
+            compact_every (int): The number of entries after which the journal is compacted.
+            dump (Callable[[AddressBook], bytes]): Serializes the book into snapshot file contents.
+        """
+        self.book = book.make_thread_safe()
+        self.filename = filename
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+        self.dump = dump
+        self._path, self._rotated_path = journal_paths(filename)
+        self._seq = book.journal_seq
+        self._pending: List[str] = []
+        self._since_compaction = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._compaction: Optional[threading.Thread] = None
+        self._compact_lock = threading.Lock()
+        self._closed = threading.Event()
+        if os.path.exists(self._rotated_path):
+            # A previous compaction did not finish: its entries are only in the
+            # rotated journal, so persist them before that file can be replaced.
+            book.journal_seq = self._seq
+            self._write_snapshot(book)
+        self._committer = threading.Thread(target=self._commit_loop, daemon=True)
+        self._committer.start()
+        book.subscribe(self.append)
+
+    def append(self, op: str, name: str, *args) -> None:
+        """
+        Appends a mutation event to the journal.
+
+        Args:
+            op (str): The event operation.
+            name (str): The contact name the event refers to.
+            *args: The operation arguments.
+        """
+        with self._lock:
+            self._seq += 1
+            self._pending.append(json.dumps([self._seq, op, name, *args], ensure_ascii=False) + "\n")
+            self._since_compaction += 1
+            commit_now = len(self._pending) >= self.batch_size
+            compact_now = self._since_compaction >= self.compact_every
+        if compact_now and not self._compacting():
+            self.compact()
+        elif commit_now:
+            self.commit()
+
+    def commit(self) -> None:
+        """
+        Writes pending entries to the journal file and fsyncs it.
+        """
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if pending:
+                with instrumentation.timer(instrumentation.PERSISTENCE, "journal_commit"):
+                    self._file.writelines(pending)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Snapshots the book and starts a fresh journal.
+
+        The calling thread only takes a copy-on-write snapshot, consistent with
+        the journal position; serializing and writing it happen in the
+        background unless `wait` is set.
+
+        Args:
+            wait (bool): Whether to block until the snapshot is on disk.
+        """
+        # Compactions may be started by edits and by an autosaver; one at a
+        # time, so an older snapshot never lands after a newer one.
+        with self._compact_lock:
+            if self._compaction is not None:
+                self._compaction.join()
+            # Lock order: book, then journal I/O, then pending entries.
+            with instrumentation.timer(instrumentation.PERSISTENCE, "journal_compact"), \
+                    self.book.locked(), self._io_lock:
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                    self.book.journal_seq = self._seq
+                    snapshot = self.book.snapshot()
+                    self._since_compaction = 0
+                self._file.writelines(pending)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                os.replace(self._path, self._rotated_path)
+                self._file = open(self._path, "a", encoding="utf-8")
+            self._compaction = threading.Thread(target=self._write_snapshot, args=(snapshot,))
+            self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def close(self) -> None:
+        """
+        Stops the journal, writes a final snapshot and removes the journal files.
+
+        The snapshot is skipped when no entries were written since the last one.
+        """
+        self.book.unsubscribe(self.append)
+        self._closed.set()
+        self._committer.join()
+        self.commit()
+        if self._compaction is not None:
+            self._compaction.join()
+        if os.path.getsize(self._path) or os.path.exists(self._rotated_path):
+            self.compact(wait=True)
+        self._file.close()
+        os.remove(self._path)
+
+    def _compacting(self) -> bool:
+        # While a snapshot is still being written, compaction is retried on a
+        # later entry instead of blocking the edit until it finishes.
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def _commit_loop(self) -> None:
+        while not self._closed.wait(self.commit_interval):
+            self.commit()
+
+    def _write_snapshot(self, snapshot: AddressBook) -> None:
+        with instrumentation.timer(instrumentation.PERSISTENCE, "snapshot_write"):
+            atomic_write(self.filename, self.dump(snapshot))
+        try:
+            os.remove(self._rotated_path)
+        except FileNotFoundError:
+            pass
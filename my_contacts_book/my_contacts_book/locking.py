@@ -0,0 +1,95 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+
+_NO_LOCK = nullcontext()
+
+
+class RWLock:
+    """
+    Reader/writer lock for threads.
+
+    Any number of threads may hold the lock for reading, or one thread for
+    writing. Waiting writers block new readers, so writers are not starved.
+    The lock is reentrant: a writer may read or write again, and a reader
+    may read again. Upgrading a read to a write raises RuntimeError instead
+    of deadlocking.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writer = None
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Holds the lock for reading inside the block.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Holds the lock for writing inside the block.
+
+        Raises:
+            RuntimeError: If the calling thread holds the lock for reading only.
+        """
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
+
+
+class NullLock:
+    """
+    Stand-in for RWLock in single-threaded use; both modes are no-ops.
+    """
+
+    def read(self) -> ContextManager[None]:
+        return _NO_LOCK
+
+    def write(self) -> ContextManager[None]:
+        return _NO_LOCK
+
+
+NULL_LOCK = NullLock()
@@ -1,28 +1,107 @@
-import pickle
-from transliteration import suggest_command, transliterate
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from atomic_file import atomic_write
+from autosave import Autosaver
+from journal import Journal, pickle_snapshot, replay
+from history import History
+import formatting
+import instrumentation
+from commands import CommandRegistry
+from transliteration import CommandSuggester
 from address_book import AddressBook
 from handlers import (
     add_contact, change_birthday, change_contact, delete_contact, show_phone, show_all,
-    add_birthday, show_birthday, birthdays
+    add_birthday, show_birthday, birthdays, show_phone_owner, search_contacts,
+    import_file, export_file, dedupe_contacts, undo_changes, redo_changes, show_stats
 )
 from colorama import init, Fore, Style
 
 init(autoreset=True)
 
+SQLITE_FILENAME = "addressbook.db"
+MMAP_FILENAME = "addressbook.mcb"
+EXIT_COMMANDS = ["close", "exit", "bye"]
+
+registry = CommandRegistry()
+registry.register("hello", lambda args: "How can I help you?", "hello", "Displays a greeting message.",
+                  arity=(0, None), uses_book=False)
+registry.register("help", lambda args: print_help(), "help", "Shows this help message.",
+                  arity=(0, None), uses_book=False)
+registry.register("add", add_contact, "add <name> <phone> [birthday]",
+                  "Adds a new contact with the specified name, phone number and optional birthday.\n"
+                  "If the contact already exists but with a different number, the contact will be updated.",
+                  arity=(2, 3), mutates=True)
+registry.register("change", change_contact, "change <name> <old_phone> [new_phone]",
+                  "Changes the phone number for an existing contact.\n"
+                  "If only the name and the existing number are provided, the number will be removed.",
+                  arity=(2, 3), mutates=True)
+registry.register("phone", show_phone, "phone <name>", "Shows the phone number for the specified contact.",
+                  arity=(1, 1))
+registry.register("who", show_phone_owner, "who <phone>", "Shows the contacts that own the specified phone number.",
+                  arity=(1, 1))
+registry.register("search", search_contacts, "search <fragment>",
+                  "Finds contacts whose names start with or resemble the fragment.", arity=(1, 1))
+registry.register("all", show_all, "all [--page N] [--size K]",
+                  "Shows all contacts with their phone numbers, optionally one page at a time.", arity=(0, 4))
+registry.register("add-birthday", add_birthday, "add-birthday <name> <birthday>",
+                  "Adds a birthday to the specified contact.", arity=(2, 2), mutates=True)
+registry.register("show-birthday", show_birthday, "show-birthday <name>",
+                  "Shows the birthday for the specified contact.", arity=(1, 1))
+registry.register("birthdays", birthdays, "birthdays [days]",
+                  "Shows upcoming birthdays within the next 7 (or the given number of) days,\n"
+                  "with weekend birthdays congratulated on Monday.", arity=(0, 1))
+registry.register("change-birthday", change_birthday, "change-birthday <name> <new_birthday>",
+                  "Changes the birthday for an existing contact.", arity=(2, 2), mutates=True)
+registry.register("delete", delete_contact, "delete <name>", "Deletes a contact from the address book.",
+                  arity=(1, 1), mutates=True)
+registry.register("import", import_file, "import <file> [--workers N]",
+                  "Imports contacts from a CSV or vCard (.vcf) file.\n"
+                  "Invalid entries are written to <file>.rejects.csv.", arity=(1, 3), mutates=True,
+                  uses_files=True)
+registry.register("export", export_file, "export <file>", "Exports all contacts to a CSV or vCard (.vcf) file.",
+                  arity=(1, 1), uses_files=True)
+registry.register("dedupe", dedupe_contacts, "dedupe [merge [group ...]]",
+                  "Lists groups of likely duplicates: the same name in another case, layout or word order,\n"
+                  "or a shared phone. With merge, merges the groups with matching names, or the listed groups,\n"
+                  "into their first contact.",
+                  arity=(0, None), mutates=True)
+registry.register("undo", undo_changes, "undo [count]",
+                  "Reverts the changes of the last command, or of the last count commands.\n"
+                  "Available for the current interactive session.", arity=(0, 1), mutates=True)
+registry.register("redo", redo_changes, "redo [count]", "Reapplies the changes reverted by undo.",
+                  arity=(0, 1), mutates=True)
+registry.register("stats", show_stats, "stats [reset | profile]",
+                  "Shows per-command timings collected with --stats or --profile.", arity=(0, 1), uses_book=False)
+registry.register(EXIT_COMMANDS, lambda args: "Good bye!", " / ".join(EXIT_COMMANDS), "Exits the program.",
+                  arity=(0, None), uses_book=False)
+suggester = CommandSuggester(registry.names())
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
 def save_data(book: AddressBook, filename: str = "addressbook.pkl") -> None:
     """
     Saves the address book to a file.
 
+    The file is replaced atomically, so a crash during the save leaves the
+    previous version intact.
+
     Args:
         book (AddressBook): The address book instance to save.
         filename (str): The filename to save the address book to.
     """
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
+    with instrumentation.timer(instrumentation.PERSISTENCE, "save_data"):
+        atomic_write(filename, pickle_snapshot(book))
 
 def load_data(filename: str = "addressbook.pkl") -> AddressBook:
     """
-    Loads the address book from a file.
+    Loads the address book from a file and replays the journal written after it.
+
+    A filename ending in .db opens a SQLite address book instead, which is
+    read lazily and needs no journal. A filename ending in .mcb maps a binary
+    snapshot whose records are read on first access.
 
     Args:
         filename (str): The filename to load the address book from.
@@ -30,11 +109,23 @@ def load_data(filename: str = "addressbook.pkl") -> AddressBook:
     Returns:
         AddressBook: The loaded address book instance.
     """
+    # Each storage imports its modules (pickle, sqlite3, mmap) only when it is used.
+    if filename.endswith(".db"):
+        from sqlite_book import SQLiteAddressBook
+        return SQLiteAddressBook(filename)
+    if filename.endswith(".mcb"):
+        from mmap_book import MmapAddressBook
+        book = MmapAddressBook(filename)
+        replay(book, filename)
+        return book
+    import pickle
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            book = pickle.load(f)
     except FileNotFoundError:
-        return AddressBook()
+        book = AddressBook()
+    replay(book, filename)
+    return book
 
 def print_message(message: str, is_error: bool = False) -> None:
     """
@@ -49,9 +140,22 @@ def print_message(message: str, is_error: bool = False) -> None:
     else:
         print(Fore.GREEN + message + Style.RESET_ALL)
 
-def handle_action(action: str, args: list[str], book: AddressBook) -> str:
+def print_response(response: Union[str, Iterator[str]]) -> None:
+    """
+    Prints a handler response, writing streamed responses chunk by chunk.
+
+    Args:
+        response (Union[str, Iterator[str]]): The response or its chunks.
+    """
+    if isinstance(response, str):
+        print(response)
+    else:
+        for chunk in response:
+            print(chunk, end="", flush=True)
+
+def handle_action(action: str, args: list[str], book: AddressBook) -> Union[str, Iterator[str]]:
     """
-    Handles the action by calling the appropriate function using match...case.
+    Handles the action by dispatching it to the registered command.
 
     Args:
         action (str): The command to execute.
@@ -59,35 +163,11 @@ def handle_action(action: str, args: list[str], book: AddressBook) -> str:
         book (AddressBook): The address book instance.
 
     Returns:
-        str: The response string after executing the command.
-    """
-    match action:
-        case "hello":
-            return "How can I help you?"
-        case "add":
-            return add_contact(args, book)
-        case "change":
-            return change_contact(args, book)
-        case "phone":
-            return show_phone(args, book)
-        case "all":
-            return show_all(book)
-        case "add-birthday":
-            return add_birthday(args, book)
-        case "show-birthday":
-            return show_birthday(args, book)
-        case "birthdays":
-            return birthdays(args, book)
-        case "change-birthday":
-            return change_birthday(args, book)
-        case "delete":
-            return delete_contact(args, book)
-        case "help":
-            return print_help()
-        case "close" | "exit" | "bye":
-            return "Good bye!"
-        case _:
-            return "Invalid command. Available commands are: hello, add, change, phone, all, add-birthday, show-birthday, birthdays, change-birthday, delete, close, exit, bye."
+        Union[str, Iterator[str]]: The response string after executing the command,
+        or its chunks for streamed output.
+    """
+    with instrumentation.timer(action, "handler"):
+        return registry.dispatch(action, args, book)
 
 def parse_input(user_input: str) -> tuple[str, list[str]]:
     """
@@ -110,50 +190,304 @@ def print_help() -> str:
     Returns:
         str: The help message string.
     """
-    help_message = f"""
-    {Fore.CYAN}Available commands:
-    - hello: Displays a greeting message.
-    - help: Shows this help message.
-    - add <name> <phone>: Adds a new contact with the specified name and phone number. 
-                          If the contact already exists but with a different number, the contact will be updated.
-    - change <name> <old_phone> <new_phone>: Changes the phone number for an existing contact. 
-                                             If only the name and the existing number are provided, the number will be removed.
-    - phone <name>: Shows the phone number for the specified contact.
-    - all: Shows all contacts with their phone numbers.
-    - add-birthday <name> <birthday>: Adds a birthday to the specified contact.
-    - show-birthday <name>: Shows the birthday for the specified contact.
-    - birthdays: Shows upcoming birthdays within the next 7 days.
-    - change-birthday <name> <new_birthday>: Changes the birthday for an existing contact.
-    - delete <name>: Deletes a contact from the address book.
-    - close / exit / bye: Exits the program.{Style.RESET_ALL}
-    """
-    return help_message
-
-def main() -> None:
+    commands = "\n".join(f"    {line}" for line in registry.help_text().split("\n"))
+    return f"\n    {Fore.CYAN}Available commands:\n{commands}{Style.RESET_ALL}\n    "
+
+def strip_colors(text: str) -> str:
+    """
+    Removes color codes from a response.
+
+    Args:
+        text (str): The colored text.
+
+    Returns:
+        str: The plain text.
+    """
+    return ANSI_ESCAPE.sub("", text)
+
+def is_failure(response: str) -> bool:
+    """
+    Tells whether a handler response reports an error.
+
+    Args:
+        response (str): The response string.
+
+    Returns:
+        bool: True for error and invalid command responses.
+    """
+    return response.startswith(Fore.YELLOW) or response.startswith("Invalid command")
+
+def run_batch(lines: Iterable[str], book: AddressBook, out: TextIO = sys.stdout) -> dict:
+    """
+    Runs commands non-interactively, one per line, without suggestions or colors.
+
+    Empty lines and lines starting with # are skipped, and an exit command
+    ends the script. Every command is reported with its plain-text result,
+    followed by a throughput summary.
+
+    Args:
+        lines (Iterable[str]): The command lines.
+        book (AddressBook): The address book instance.
+        out (TextIO): Where to write the results.
+
+    Returns:
+        dict: The number of commands and failures, the elapsed seconds and commands per second.
+    """
+    commands = failures = 0
+    started = time.perf_counter()
+    for line_number, line in enumerate(lines, 1):
+        user_input = line.strip()
+        if not user_input or user_input.startswith("#"):
+            continue
+        action, args = parse_input(user_input)
+        if action in EXIT_COMMANDS:
+            break
+        response = handle_action(action, args, book)
+        if not isinstance(response, str):
+            response = "".join(response)
+        commands += 1
+        failed = is_failure(response)
+        failures += failed
+        status = "FAIL" if failed else "OK"
+        out.write(f"{line_number}: {status} {user_input}\n{strip_colors(response).strip()}\n")
+    elapsed = time.perf_counter() - started
+    stats = {
+        "commands": commands,
+        "failures": failures,
+        "seconds": elapsed,
+        "commands_per_second": commands / elapsed if elapsed else 0.0,
+    }
+    out.write(f"{commands} commands, {failures} failed, {elapsed:.3f} s, "
+              f"{stats['commands_per_second']:.0f} commands/s\n")
+    return stats
+
+def main(argv: Optional[list[str]] = None) -> int:
     """
     Main function to run the assistant bot.
+
+    When the arguments start with a command instead of an option, that one
+    command is run and the bot exits without parsing options; a command
+    after the options, e.g. `--output json all`, is run the same way.
+
+    Args:
+        argv (Optional[list[str]]): Command-line arguments, sys.argv[1:] by default.
+
+    Returns:
+        int: The exit status.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and not argv[0].startswith("-"):
+        return run_once(argv)
+
+    import argparse
+    parser = argparse.ArgumentParser(prog="my_contacts_book", description="Contacts book bot.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run the commands from FILE ('-' for stdin) without prompts and save once at the end")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect per-command timings, shown by the stats command")
+    parser.add_argument("--profile", action="store_true",
+                        help="collect timings plus a cProfile and tracemalloc profile, printed to stderr on exit")
+    parser.add_argument("--serve", metavar="ADDRESS", nargs="?", const="127.0.0.1:8765",
+                        help="serve the book to socket clients on host:port or unix:PATH (default 127.0.0.1:8765)")
+    parser.add_argument("--output", choices=formatting.OUTPUT_MODES, default=formatting.TABLE,
+                        help="print tables as bordered tables (default), tab-separated plain text or JSON")
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="run this one command and exit, e.g. phone Alice")
+    options = parser.parse_args(argv)
+    formatting.set_mode(options.output)
+    if options.stats or options.profile:
+        instrumentation.enable(profile=options.profile)
+    try:
+        if options.command:
+            return run_once(options.command)
+        run_mode(options)
+    finally:
+        if options.profile:
+            sys.stderr.write(strip_colors(show_stats([])) + "\n" + instrumentation.profile_report())
+    return 0
+
+def run_mode(options: "argparse.Namespace") -> None:
+    """
+    Runs the bot in the mode selected on the command line.
+
+    Args:
+        options (argparse.Namespace): The parsed command-line options.
     """
-    book = load_data() 
+    if options.batch:
+        batch_main(options.batch)
+        return
+    if options.serve:
+        serve_main(options.serve)
+        return
+
+    book, journal = open_book()
+    book.index_names(background=True)
+    # Every change is already durable in the journal; the autosaver folds the
+    # journal into a fresh snapshot once a minute while there are new changes,
+    # so a crashed session leaves only a short journal to replay.
+    saver = Autosaver(book, lambda snapshot: journal.compact(), interval=60.0,
+                      max_changes=journal.compact_every) if journal is not None else None
+    history = History(book)
     print(f"{Fore.BLUE}Welcome to the assistant bot!{Style.RESET_ALL}")
     print(print_help()) 
-    while True:
-        user_input = input("Enter a command:\n").strip().lower()
-        if not user_input:
-            continue
+    try:
+        while True:
+            user_input = input("Enter a command:\n").strip()
+            if not user_input:
+                continue
 
-        action, args = parse_input(user_input)
+            started = time.perf_counter()
+            action, args = parse_input(user_input)
+            parsed = time.perf_counter()
+            suggested_command = suggester.suggest(action)
+            suggested = time.perf_counter()
+            if suggested_command and suggested_command != action:
+                confirm = input(f"Do you mean '{suggested_command}'? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    action = suggested_command
+
+            with history.step(user_input):
+                response = handle_action(action, args, book)
+            handled = time.perf_counter()
+            print_response(response)
+            if instrumentation.enabled:
+                instrumentation.record(action, "parse", parsed - started)
+                instrumentation.record(action, "suggest", suggested - parsed)
+                instrumentation.record(action, "render", time.perf_counter() - handled)
+            if action in EXIT_COMMANDS:
+                break
+    finally:
+        if saver is not None:
+            saver.close()
+        close_book(book, journal)
+
+def open_book(journaled: bool = True) -> Tuple[AddressBook, Optional[Journal]]:
+    """
+    Opens the stored book, preferring SQLite, then the memory-mapped snapshot, then the pickle file.
 
-        suggested_command = suggest_command(action, ["hello", "add", "change", "phone", "all", "add-birthday", "show-birthday", "birthdays", "change-birthday", "delete", "help", "close", "exit", "bye"])
-        if suggested_command and suggested_command != action:
-            confirm = input(f"Do you mean '{suggested_command}'? (y/n): ").strip().lower()
-            if confirm == 'y':
-                action = suggested_command
+    Args:
+        journaled (bool): Whether changes will be made and must be journaled;
+            a book opened only for reading is never written back.
+
+    Returns:
+        Tuple[AddressBook, Optional[Journal]]: The book and the journal recording
+        its changes, or None for SQLite, which writes changes itself, and for read-only use.
+    """
+    if os.path.exists(SQLITE_FILENAME):
+        return load_data(SQLITE_FILENAME), None
+    if os.path.exists(MMAP_FILENAME):
+        from mmap_book import snapshot_bytes
+        book = load_data(MMAP_FILENAME)
+        return book, Journal(book, MMAP_FILENAME, dump=snapshot_bytes) if journaled else None
+    book = load_data()
+    return book, Journal(book) if journaled else None
+
+def close_book(book: AddressBook, journal: Optional[Journal]) -> None:
+    """
+    Persists the changes of a book opened with open_book and releases its files.
+
+    Args:
+        book (AddressBook): The address book instance.
+        journal (Optional[Journal]): Its journal, if any.
+    """
+    if journal is not None:
+        journal.close()
+    if hasattr(book, "close"):
+        book.close()
+
+def run_once(argv: List[str]) -> int:
+    """
+    Runs a single command given on the command line, e.g. `my_contacts_book phone Alice`.
 
+    No banner or help is printed and nothing is asked: an unknown command is
+    answered with a suggestion. The book is opened only for commands that use
+    it and journaled only for commands that change it; changes are persisted
+    as in the interactive mode before returning.
+
+    Args:
+        argv (List[str]): The command followed by its arguments.
+
+    Returns:
+        int: The exit status, 1 if the command failed.
+    """
+    action, args = argv[0].lower(), argv[1:]
+    command = registry.get(action)
+    if command is None:
+        suggested_command = suggester.suggest(action)
+        hint = f" Did you mean '{suggested_command}'?" if suggested_command else ""
+        print(f"{Fore.YELLOW}Unknown command '{action}'.{hint}{Style.RESET_ALL}")
+        return 1
+    if not command.uses_book:
+        response = handle_action(action, args, None)
+        print(response)
+        return 1 if is_failure(response) else 0
+    book, journal = open_book(journaled=command.mutates)
+    try:
         response = handle_action(action, args, book)
+        if not isinstance(response, str):
+            response = "".join(response)
         print(response)
-        if action in ["close", "exit", "bye"]:
-            save_data(book)
-            break
+    finally:
+        close_book(book, journal)
+    return 1 if is_failure(response) else 0
+
+def batch_main(filename: str) -> None:
+    """
+    Runs a batch script against the stored book and persists the result once.
+
+    Nothing is written when the script changed nothing.
+
+    Args:
+        filename (str): The script filename, or '-' for stdin.
+    """
+    if os.path.exists(SQLITE_FILENAME):
+        book = load_data(SQLITE_FILENAME)
+        commit = book.deferred_commit()
+    elif os.path.exists(MMAP_FILENAME):
+        book = load_data(MMAP_FILENAME)
+        commit = nullcontext()
+    else:
+        book = load_data()
+        commit = nullcontext()
+    script = sys.stdin if filename == "-" else open(filename, "r", encoding="utf-8")
+    try:
+        with commit:
+            run_batch(script, book)
+    finally:
+        if script is not sys.stdin:
+            script.close()
+        if not hasattr(book, "close"):
+            if book.changes:
+                save_data(book)
+        else:
+            # A memory-mapped book is rewritten once; SQLite has written every change already.
+            if hasattr(book, "save") and book.changes:
+                book.save()
+            book.close()
+
+def serve_main(address: str) -> None:
+    """
+    Serves the stored book over a socket until interrupted.
+
+    Args:
+        address (str): "host:port" for TCP, or "unix:<path>" for a Unix socket.
+    """
+    import asyncio
+    from server import BookServer
+
+    book, journal = open_book()
+    book.index_names(background=True)
+    commit = book.deferred_commit() if journal is None else nullcontext()
+    server = BookServer(book, commit=book.db.commit if journal is None else journal.commit)
+    print(f"{Fore.BLUE}Serving the address book on {address}. Press Ctrl-C to stop.{Style.RESET_ALL}")
+    try:
+        with commit:
+            asyncio.run(server.serve(address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_book(book, journal)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
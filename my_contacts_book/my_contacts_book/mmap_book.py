@@ -0,0 +1,504 @@
+import array
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from address_book import AddressBook, birthday_bucket, window_buckets
+from atomic_file import atomic_write
+from birthday import Birthday, format_birthday
+from locking import NULL_LOCK
+from phone import Phone
+from record import Record
+
+MAGIC = b"MCBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+SECTION = struct.Struct("<QQ")
+# Section order in the file. Records are numbered in name order.
+SECTIONS = (
+    "name_offsets",    # u64[count + 1] into name_data
+    "name_data",       # UTF-8 names, sorted
+    "phone_offsets",   # u64[count + 1] into phones
+    "phones",          # i64 phone numbers, grouped per record
+    "birthdays",       # i32 date ordinals, 0 when unset
+    "order",           # u32 record numbers in insertion order
+    "bucket_offsets",  # u32[367] into bucket_ids
+    "bucket_ids",      # u32 record numbers grouped by birthday bucket, in insertion order
+    "phone_keys",      # i64 phone numbers, sorted
+    "phone_owners",    # u32 record number owning phone_keys[i]
+)
+_FORMATS = {
+    "name_offsets": "Q", "phone_offsets": "Q", "phones": "q", "birthdays": "i", "order": "I",
+    "bucket_offsets": "I", "bucket_ids": "I", "phone_keys": "q", "phone_owners": "I",
+}
+
+# (name, packed phones, birthday ordinal or 0)
+RawRecord = Tuple[str, List[int], int]
+
+
+def iter_raw(book: AddressBook) -> Iterator[RawRecord]:
+    """
+    Yields the fields of every record of a book as plain values.
+
+    Records of a memory-mapped book that were not touched are read straight
+    from the snapshot, without creating Record objects.
+
+    Args:
+        book (AddressBook): The address book.
+
+    Returns:
+        Iterator[RawRecord]: The name, packed phones and birthday ordinal of each record.
+    """
+    if isinstance(book, MmapAddressBook):
+        return book._iter_raw()
+    # A plain dict is iterated directly, skipping the per-item UserDict lookup.
+    return map(_raw, book.data.values() if type(book.data) is dict else book.values())
+
+
+def snapshot_bytes(book: AddressBook) -> bytes:
+    """
+    Serializes an address book into the versioned binary snapshot format.
+
+    Args:
+        book (AddressBook): The address book to serialize.
+
+    Returns:
+        bytes: The snapshot file contents.
+    """
+    raw = list(iter_raw(book))
+    by_name = sorted(range(len(raw)), key=lambda i: raw[i][0].encode("utf-8"))
+    position = {original: number for number, original in enumerate(by_name)}
+
+    names = [raw[i][0].encode("utf-8") for i in by_name]
+    name_offsets = [0]
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    phones: List[int] = []
+    phone_offsets = [0]
+    birthdays = []
+    buckets: List[List[int]] = [[] for _ in range(366)]
+    phone_pairs = []
+    for number, i in enumerate(by_name):
+        _, record_phones, birthday = raw[i]
+        phones.extend(record_phones)
+        phone_offsets.append(len(phones))
+        phone_pairs.extend((phone, number) for phone in dict.fromkeys(record_phones))
+        birthdays.append(birthday)
+    for i, (_, _, birthday) in enumerate(raw):
+        if birthday:
+            day = date.fromordinal(birthday)
+            buckets[birthday_bucket(day.month, day.day)].append(position[i])
+    bucket_offsets = [0]
+    bucket_ids = []
+    for bucket in buckets:
+        bucket_ids.extend(bucket)
+        bucket_offsets.append(len(bucket_ids))
+    phone_pairs.sort()
+
+    sections = {
+        "name_offsets": name_offsets,
+        "name_data": b"".join(names),
+        "phone_offsets": phone_offsets,
+        "phones": phones,
+        "birthdays": birthdays,
+        "order": [position[i] for i in range(len(raw))],
+        "bucket_offsets": bucket_offsets,
+        "bucket_ids": bucket_ids,
+        "phone_keys": [phone for phone, _ in phone_pairs],
+        "phone_owners": [owner for _, owner in phone_pairs],
+    }
+    body = bytearray()
+    table = []
+    start = HEADER.size + SECTION.size * len(SECTIONS)
+    for section in SECTIONS:
+        value = sections[section]
+        data = value if isinstance(value, bytes) else array.array(_FORMATS[section], value).tobytes()
+        table.append(SECTION.pack(start + len(body), len(data)))
+        body += data
+        body += b"\0" * (-len(body) % 8)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(raw), book.journal_seq)
+    return header + b"".join(table) + bytes(body)
+
+
+def write_snapshot(book: AddressBook, filename: str) -> None:
+    """
+    Writes a binary snapshot atomically (temp file, fsync, rename).
+
+    Args:
+        book (AddressBook): The address book to write.
+        filename (str): The snapshot filename.
+    """
+    atomic_write(filename, snapshot_bytes(book))
+
+
+class Snapshot:
+    """
+    Read-only view of a binary snapshot file opened with mmap.
+
+    Opening only maps the file and reads the header; sections are read on
+    demand, so the page cache is shared between processes reading the same
+    snapshot.
+
+    Attributes:
+        count (int): The number of records.
+        journal_seq (int): The last journal sequence number contained in the snapshot.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, self.journal_seq = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not an address book snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        self._views = [memoryview(self._mmap)]
+        sections = {}
+        for i, section in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._views.append(self._views[0][offset:offset + length])
+            if section in _FORMATS:
+                self._views.append(self._views[-1].cast(_FORMATS[section]))
+            sections[section] = self._views[-1]
+        self.name_offsets = sections["name_offsets"]
+        self.name_data = sections["name_data"]
+        self.phone_offsets = sections["phone_offsets"]
+        self.phones = sections["phones"]
+        self.birthdays = sections["birthdays"]
+        self.order = sections["order"]
+        self.bucket_offsets = sections["bucket_offsets"]
+        self.bucket_ids = sections["bucket_ids"]
+        self.phone_keys = sections["phone_keys"]
+        self.phone_owners = sections["phone_owners"]
+
+    def close(self) -> None:
+        """
+        Releases the section views and unmaps the file.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def name(self, number: int) -> str:
+        """
+        Returns the name of the record with a number.
+        """
+        return bytes(self.name_data[self.name_offsets[number]:self.name_offsets[number + 1]]).decode("utf-8")
+
+    def find(self, name: str) -> Optional[int]:
+        """
+        Binary-searches the sorted name section.
+
+        Args:
+            name (str): The name to look up.
+
+        Returns:
+            Optional[int]: The record number, or None if the name is not in the snapshot.
+        """
+        key = name.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self.name_data[self.name_offsets[middle]:self.name_offsets[middle + 1]]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.name(low) == name:
+            return low
+        return None
+
+    def raw(self, number: int) -> RawRecord:
+        """
+        Reads the fields of the record with a number.
+        """
+        phones = list(self.phones[self.phone_offsets[number]:self.phone_offsets[number + 1]])
+        return self.name(number), phones, self.birthdays[number]
+
+    def bucket(self, bucket: int) -> memoryview:
+        """
+        Returns the numbers of the records with birthdays in a bucket.
+        """
+        return self.bucket_ids[self.bucket_offsets[bucket]:self.bucket_offsets[bucket + 1]]
+
+    def phone_owners_of(self, phone: int) -> List[int]:
+        """
+        Binary-searches the sorted phone section for the owners of a number.
+        """
+        start = bisect_left(self.phone_keys, phone)
+        owners = []
+        while start < len(self.phone_keys) and self.phone_keys[start] == phone:
+            owners.append(self.phone_owners[start])
+            start += 1
+        return owners
+
+
+class MmapRecords(MutableMapping):
+    """
+    Mapping of names to records over a snapshot plus an in-memory overlay.
+
+    Records are materialized from the snapshot on first access and then kept
+    in the overlay, together with added records; deleted snapshot records are
+    remembered by name. A deleted snapshot name that is added again stays in
+    the deleted set and is listed with the added records, like a re-inserted
+    dict key.
+    """
+
+    def __init__(self, snapshot: Snapshot, book: "MmapAddressBook"):
+        self.snapshot = snapshot
+        self._book = book
+        self.overlay: Dict[str, Record] = {}
+        self.deleted: Set[str] = set()
+        self.extra: Dict[str, None] = {}
+
+    def copy(self, book: "MmapAddressBook") -> "MmapRecords":
+        """
+        Copies the overlay state over the same snapshot, for a view owned by another book.
+
+        Args:
+            book (MmapAddressBook): The book the copy belongs to.
+
+        Returns:
+            MmapRecords: The copy.
+        """
+        records = MmapRecords(self.snapshot, book)
+        records.overlay = dict(self.overlay)
+        records.deleted = set(self.deleted)
+        records.extra = dict(self.extra)
+        return records
+
+    def __getitem__(self, name: str) -> Record:
+        record = self.overlay.get(name)
+        if record is not None:
+            return record
+        number = None if name in self.deleted else self.snapshot.find(name)
+        if number is None:
+            raise KeyError(name)
+        record = _materialize(self.snapshot.raw(number))
+        record.book = self._book
+        self.overlay[name] = record
+        self._book._index(record)
+        return record
+
+    def __setitem__(self, name: str, record: Record) -> None:
+        if name not in self.overlay and (name in self.deleted or self.snapshot.find(name) is None):
+            self.extra[name] = None
+        self.overlay[name] = record
+
+    def __delitem__(self, name: str) -> None:
+        in_overlay = self.overlay.pop(name, None) is not None
+        self.extra.pop(name, None)
+        if name not in self.deleted and self.snapshot.find(name) is not None:
+            self.deleted.add(name)
+        elif not in_overlay:
+            raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self.overlay:
+            return True
+        return isinstance(name, str) and name not in self.deleted and self.snapshot.find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for number in self.snapshot.order:
+            name = self.snapshot.name(number)
+            if name not in self.deleted:
+                yield name
+        yield from list(self.extra)
+
+    def __len__(self) -> int:
+        return self.snapshot.count - len(self.deleted) + len(self.extra)
+
+    def is_current(self, number: int) -> Optional[str]:
+        """
+        Returns the name of a snapshot record if the snapshot copy is still current.
+        """
+        name = self.snapshot.name(number)
+        if name in self.overlay or name in self.deleted:
+            return None
+        return name
+
+
+def _materialize(raw: RawRecord) -> Record:
+    name, phones, birthday = raw
+    record = Record(name)
+    record.phones = [Phone(f"{phone:010d}") for phone in phones]
+    if birthday:
+        record.birthday = Birthday(format_birthday(date.fromordinal(birthday)))
+    return record
+
+
+class MmapAddressBook(AddressBook):
+    """
+    Address book backed by a memory-mapped binary snapshot.
+
+    Opening the book maps the file without reading it, so startup does not
+    depend on the book size. Records are materialized only when find,
+    iteration or a query touches them; edits live in memory until the
+    snapshot is rewritten with save().
+
+    Attributes:
+        filename (str): The snapshot filename.
+        mapped (Snapshot): The mapped snapshot file.
+    """
+
+    def __init__(self, filename: str = "addressbook.mcb"):
+        """
+        Opens the snapshot, or starts an empty book if the file does not exist.
+
+        Args:
+            filename (str): The snapshot filename.
+        """
+        super().__init__()
+        self.filename = filename
+        if not os.path.exists(filename):
+            write_snapshot(AddressBook(), filename)
+        self.mapped = Snapshot(filename)
+        self.journal_seq = self.mapped.journal_seq
+        self.data = MmapRecords(self.mapped, self)
+
+    def __getstate__(self) -> dict:
+        raise TypeError("MmapAddressBook is stored as a binary snapshot and cannot be pickled")
+
+    def snapshot(self) -> "MmapAddressBook":
+        """
+        Returns a consistent read-only view of the book.
+
+        The view shares the mapped file, which never changes, and copies only
+        the in-memory overlay of touched, added and deleted records, so taking
+        it does not materialize untouched records. The view must not be closed.
+
+        Returns:
+            MmapAddressBook: The snapshot.
+        """
+        if self._lock is NULL_LOCK:
+            return self
+        with self._lock.write():
+            snapshot = MmapAddressBook.__new__(MmapAddressBook)
+            AddressBook.__init__(snapshot)
+            snapshot.filename = self.filename
+            snapshot.mapped = self.mapped
+            snapshot.journal_seq = self.journal_seq
+            snapshot.changes = self.changes
+            snapshot.data = self.data.copy(snapshot)
+            self._snapshots[id(snapshot)] = snapshot
+        return snapshot
+
+    def _preserve(self, name: str, record: Record) -> None:
+        if self.data.overlay.get(name) is record:
+            self.data.overlay[name] = record.copy()
+
+    def save(self, filename: Optional[str] = None) -> None:
+        """
+        Writes the book, including in-memory edits, as a new snapshot.
+
+        Args:
+            filename (Optional[str]): The target file, the opened snapshot by default.
+        """
+        write_snapshot(self, filename or self.filename)
+
+    def close(self) -> None:
+        """
+        Releases the mapped snapshot.
+        """
+        self.mapped.close()
+
+    def find_by_phone(self, phone: str) -> List[Record]:
+        """
+        Finds the records that contain a phone number.
+
+        Args:
+            phone (str): The phone number to look up.
+
+        Returns:
+            List[Record]: The records holding the number.
+        """
+        records = super().find_by_phone(phone)
+        if phone.isdigit() and len(phone) == 10:
+            for number in self.mapped.phone_owners_of(int(phone)):
+                name = self.data.is_current(number)
+                if name is not None:
+                    records.append(self.data[name])
+        return records
+
+    def get_upcoming_birthdays(self, days: int = 7, today: Optional[date] = None) -> List[Record]:
+        """
+        Gets contacts with upcoming birthdays within the next `days` days.
+
+        Args:
+            days (int): The size of the window in days, today included.
+            today (Optional[date]): The first day of the window, date.today() by default.
+
+        Returns:
+            List[Record]: A list of records with upcoming birthdays, in date order.
+        """
+        upcoming_birthdays = []
+        for bucket in window_buckets(days, today):
+            names = [self.data.is_current(number) for number in self.mapped.bucket(bucket)]
+            names.extend(self._birthday_index[bucket])
+            upcoming_birthdays.extend(self.data[name] for name in names if name is not None)
+        return upcoming_birthdays
+
+    def _rebuild_indexes(self) -> None:
+        pass
+
+    def _iter_raw(self) -> Iterator[RawRecord]:
+        """
+        Yields every record in insertion order without materializing untouched ones.
+        """
+        for number in self.mapped.order:
+            name = self.mapped.name(number)
+            if name in self.data.deleted:
+                continue
+            if name in self.data.overlay:
+                yield _raw(self.data.overlay[name])
+            else:
+                yield self.mapped.raw(number)
+        for name in self.data.extra:
+            yield _raw(self.data.overlay[name])
+
+
+def _raw(record: Record) -> RawRecord:
+    return (record.name.value, [phone._value for phone in record.phones],
+            record.birthday._value if record.birthday else 0)
+
+
+def convert(source: str = "addressbook.pkl", target: str = "addressbook.mcb") -> int:
+    """
+    Converts a pickled address book into a binary snapshot.
+
+    The journal left next to the pickle by a session that did not close
+    cleanly is replayed first, so its edits are converted too.
+
+    Args:
+        source (str): The pickle filename.
+        target (str): The snapshot filename.
+
+    Returns:
+        int: The number of converted contacts.
+    """
+    import pickle
+    from journal import replay
+    with open(source, "rb") as f:
+        book = pickle.load(f)
+    replay(book, source)
+    write_snapshot(book, target)
+    return len(book)
+
+
+def main() -> None:
+    """
+    Command-line entry point converting a pickled book into a binary snapshot.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert addressbook.pkl into a memory-mapped snapshot.")
+    parser.add_argument("source", nargs="?", default="addressbook.pkl", help="pickled address book")
+    parser.add_argument("target", nargs="?", default="addressbook.mcb", help="snapshot file to write")
+    args = parser.parse_args()
+    count = convert(args.source, args.target)
+    print(f"Wrote {count} contacts to {args.target}.")
+
+
+if __name__ == "__main__":
+    main()
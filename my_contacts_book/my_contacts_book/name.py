@@ -1,4 +1,4 @@
 from field import Field
 
 class Name(Field):
-    pass
\ No newline at end of file
+    __slots__ = ()
@@ -1,9 +1,28 @@
 import re
 from field import Field
 
+PHONE_PATTERN = re.compile(r"^\d{10}$")
+
 class Phone(Field):
+    """
+    Class to represent a phone number field.
+
+    The ten digits are stored packed into a single integer; `value` renders
+    them back as a zero-padded string and validates new values.
+    """
+
+    __slots__ = ()
+
     def __init__(self, number: str):
-        self.value = self.validate_phone(number)
+        self.value = number
+
+    @property
+    def value(self) -> str:
+        return f"{self._value:010d}"
+
+    @value.setter
+    def value(self, number: str) -> None:
+        self._value = int(self.validate_phone(number))
 
     def validate_phone(self, number: str) -> str:
         """
@@ -18,7 +37,7 @@ class Phone(Field):
         Raises:
             ValueError: If the phone number is not exactly 10 digits.
         """
-        if not re.match(r"^\d{10}$", number.strip()):
+        if not PHONE_PATTERN.match(number.strip()):
             raise ValueError("Phone number should contain exactly 10 digits.")
 
         return number
\ No newline at end of file
@@ -1,4 +1,7 @@
-from typing import List, Optional
+from copy import copy
+from contextlib import nullcontext
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
 from name import Name
 from phone import Phone
 from birthday import Birthday
@@ -11,8 +14,11 @@ class Record:
         name (Name): The name of the contact.
         phones (List[Phone]): The list of phone numbers associated with the contact.
         birthday (Optional[Birthday]): The birthday of the contact.
+        book (Optional[AddressBook]): The address book holding the record, kept in sync on edits.
     """
 
+    __slots__ = ("name", "phones", "birthday", "book", "_fields", "__weakref__")
+
     def __init__(self, name: str):
         """
         Initializes a Record instance.
@@ -23,6 +29,8 @@ class Record:
         self.name = Name(name)
         self.phones: List[Phone] = []
         self.birthday: Optional[Birthday] = None
+        self.book = None
+        self._fields: Optional[Tuple[str, str, str]] = None
 
     def add_phone(self, phone: str) -> None:
         """
@@ -31,7 +39,11 @@ class Record:
         Args:
             phone (str): The phone number to add.
         """
-        self.phones.append(Phone(phone))
+        new_phone = Phone(phone)
+        with self._changing():
+            self.phones.append(new_phone)
+            if self.book is not None:
+                self.book._phone_added(self, new_phone.value)
 
     def remove_phone(self, phone: str) -> None:
         """
@@ -40,7 +52,12 @@ class Record:
         Args:
             phone (str): The phone number to remove.
         """
-        self.phones = [p for p in self.phones if p.value != phone]
+        with self._changing():
+            phones = [p for p in self.phones if p.value != phone]
+            removed = len(phones) != len(self.phones)
+            self.phones = phones
+            if removed and self.book is not None:
+                self.book._phone_removed(self, phone)
 
     def edit_phone(self, old_phone: str, new_phone: str) -> None:
         """
@@ -50,9 +67,14 @@ class Record:
             old_phone (str): The old phone number to be replaced.
             new_phone (str): The new phone number to replace the old one.
         """
-        for phone in self.phones:
-            if phone.value == old_phone:
-                phone.value = new_phone
+        with self._changing():
+            edited = None
+            for phone in self.phones:
+                if phone.value == old_phone:
+                    phone.value = new_phone
+                    edited = phone.value
+            if edited is not None and self.book is not None:
+                self.book._phone_edited(self, old_phone, edited)
 
     def find_phone(self, phone: str) -> Optional[Phone]:
         """
@@ -76,7 +98,69 @@ class Record:
         Args:
             birthday (str): The birthday value in DD.MM.YYYY format.
         """
-        self.birthday = Birthday(birthday)
+        new_birthday = Birthday(birthday)
+        with self._changing():
+            old_birthday = self.birthday
+            self.birthday = new_birthday
+            if self.book is not None:
+                self.book._birthday_changed(self, old_birthday)
+
+    def fields(self) -> Tuple[str, str, str]:
+        """
+        Returns the name, phones and birthday formatted for display.
+
+        The strings are cached until the record is edited, so listing an
+        unchanged book does not format its records again.
+
+        Returns:
+            Tuple[str, str, str]: The name, the comma-separated phones and the birthday or "".
+        """
+        fields = self._fields
+        if fields is None:
+            # Under the book's read lock an edit cannot interleave, so a
+            # half-edited record is never cached.
+            with self.book._lock.read() if self.book is not None else nullcontext():
+                phones = ", ".join([str(phone) for phone in self.phones])
+                birthday = str(self.birthday) if self.birthday else ""
+                fields = self._fields = (str(self.name), phones, birthday)
+        return fields
+
+    def copy(self) -> "Record":
+        """
+        Returns a detached copy of the record that shares no mutable state with it.
+
+        Returns:
+            Record: The copy, not attached to any book.
+        """
+        record = Record.__new__(Record)
+        record.name = self.name
+        record.phones = [copy(phone) for phone in self.phones]
+        record.birthday = self.birthday
+        record.book = None
+        record._fields = self._fields
+        return record
+
+    @contextmanager
+    def _changing(self) -> Iterator[None]:
+        try:
+            with self.book._changing(self) if self.book is not None else nullcontext():
+                yield
+        finally:
+            self._fields = None
+
+    def __getstate__(self) -> tuple:
+        """
+        Returns the pickled state without the back-reference to the book.
+        """
+        return self.name, self.phones, self.birthday
+
+    def __setstate__(self, state) -> None:
+        if isinstance(state, dict):
+            # Books pickled before records used __slots__.
+            state = state["name"], state["phones"], state.get("birthday")
+        self.name, self.phones, self.birthday = state
+        self.book = None
+        self._fields = None
 
     def __str__(self) -> str:
         """
@@ -0,0 +1,294 @@
+import math
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain
+from typing import Collection, Dict, Iterable, Iterator, List, Set
+from transliteration import transliterate
+
+def normalize_name(text: str) -> str:
+    """
+    Normalizes a name for searching: lowercases it and maps characters typed
+    in the Cyrillic keyboard layout to their Latin keys.
+
+    Args:
+        text (str): The name or query to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return transliterate(text.lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Returns the padded trigrams of a normalized string.
+
+    Args:
+        text (str): The normalized text.
+
+    Returns:
+        Set[str]: The set of trigrams.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _typo_distance(query: str, name: str) -> int:
+    # Optimal string alignment distance (Levenshtein plus adjacent swaps)
+    # between the query and the closest prefix of the name.
+    name = name[:len(query) + 2]
+    before_previous: List[int] = []
+    previous = list(range(len(name) + 1))
+    for i, query_char in enumerate(query, 1):
+        current = [i]
+        for j, name_char in enumerate(name, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_char != name_char))
+            if i > 1 and j > 1 and query_char == name[j - 2] and query[i - 2] == name_char:
+                cost = min(cost, before_previous[j - 2] + 1)
+            current.append(cost)
+        before_previous, previous = previous, current
+    return min(previous)
+
+
+class NameIndex:
+    """
+    Incrementally maintained search index over contact names.
+
+    A sorted list of normalized names answers prefix queries by bisection and
+    doubles as an implicit trie for finding names one typo away from the
+    query; a trigram index answers queries with more errors. Everything is
+    keyed by normalized names, so a query typed in the wrong keyboard layout
+    or with different capitalization still matches.
+
+    The matching only reads the index through the underscore lookup methods,
+    so storages that keep the keys and trigrams elsewhere override those.
+
+    Attributes:
+        min_similarity (float): The lowest trigram similarity reported as a fuzzy match.
+        max_postings (int): Trigrams shared by more names than this do not propose candidates.
+        max_candidates (int): The number of trigram candidates scored per query.
+    """
+
+    def __init__(self, names: Iterable[str] = (), min_similarity: float = 0.3,
+                 max_postings: int = 1000, max_candidates: int = 50):
+        """
+        Builds the index.
+
+        Args:
+            names (Iterable[str]): The names to index.
+            min_similarity (float): The lowest trigram similarity reported as a fuzzy match.
+            max_postings (int): Trigrams shared by more names than this do not propose candidates.
+            max_candidates (int): The number of trigram candidates scored per query.
+        """
+        self.min_similarity = min_similarity
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self._names: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        for name in names:
+            self._add(name)
+        self._keys: List[str] = sorted(self._names)
+
+    def add(self, name: str) -> None:
+        """
+        Adds a name to the index.
+
+        Args:
+            name (str): The contact name.
+        """
+        key = self._add(name)
+        if len(self._names[key]) == 1:
+            insort(self._keys, key)
+
+    def remove(self, name: str) -> None:
+        """
+        Removes a name from the index.
+
+        Args:
+            name (str): The contact name.
+        """
+        key = normalize_name(name)
+        names = self._names.get(key)
+        if not names or name not in names:
+            return
+        names.discard(name)
+        if not names:
+            del self._names[key]
+            del self._keys[bisect_left(self._keys, key)]
+        del self._gram_counts[name]
+        for gram in trigrams(key):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(name)
+                if not postings:
+                    del self._trigrams[gram]
+
+    def on_event(self, op: str, name: str, *args) -> None:
+        """
+        Address book listener that keeps the index in sync with added and deleted contacts.
+        """
+        if op == "add":
+            self.add(name)
+        elif op == "delete":
+            self.remove(name)
+
+    def prefix(self, fragment: str, limit: int = 10) -> List[str]:
+        """
+        Finds names starting with a fragment, in alphabetical order of their normalized form.
+
+        Args:
+            fragment (str): The beginning of the name.
+            limit (int): The maximum number of names to return.
+
+        Returns:
+            List[str]: The matching names, an exact match first.
+        """
+        results: List[str] = []
+        for key in self._keys_starting_with(normalize_name(fragment), limit):
+            results.extend(self._names_with_key(key))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def fuzzy(self, fragment: str, limit: int = 10) -> List[str]:
+        """
+        Finds names similar to a fragment.
+
+        Names that start with the fragment after a single typo (a swapped,
+        missing, extra or wrong character) come first. The rest are ranked by
+        shared trigrams, where only the rarer trigrams of the query propose
+        candidates and at most `max_candidates` of them are scored, so the
+        cost does not grow with the number of names.
+
+        Args:
+            fragment (str): The possibly misspelled name.
+            limit (int): The maximum number of names to return.
+
+        Returns:
+            List[str]: The matching names, most similar first.
+        """
+        key = normalize_name(fragment)
+        results = self._one_typo_away(key, limit)
+        if len(results) < limit:
+            seen = set(results)
+            results.extend(name for name in self._similar(key, limit + len(results)) if name not in seen)
+        return results[:limit]
+
+    def search(self, fragment: str, limit: int = 10) -> List[str]:
+        """
+        Finds names by prefix, then fills up the result with fuzzy matches.
+
+        Args:
+            fragment (str): The name fragment typed by the user.
+            limit (int): The maximum number of names to return.
+
+        Returns:
+            List[str]: The matching names, best matches first.
+        """
+        results = self.prefix(fragment, limit)
+        if len(results) < limit:
+            seen = set(results)
+            results.extend(name for name in self.fuzzy(fragment, limit) if name not in seen)
+        return results[:limit]
+
+    def _add(self, name: str) -> str:
+        key = normalize_name(name)
+        self._names.setdefault(key, set()).add(name)
+        grams = trigrams(key)
+        self._gram_counts[name] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(name)
+        return key
+
+    def _names_with_key(self, key: str) -> List[str]:
+        return sorted(self._names.get(key, ()))
+
+    def _keys_starting_with(self, prefix: str, limit: int) -> Iterator[str]:
+        keys = self._keys
+        start = bisect_left(keys, prefix)
+        for i in range(start, min(start + limit, len(keys))):
+            if not keys[i].startswith(prefix):
+                return
+            yield keys[i]
+
+    def _has_prefix(self, prefix: str) -> bool:
+        i = bisect_left(self._keys, prefix)
+        return i < len(self._keys) and self._keys[i].startswith(prefix)
+
+    def _next_chars(self, prefix: str) -> List[str]:
+        # The children of prefix in the implicit trie: one bisection per distinct next character.
+        keys = self._keys
+        depth = len(prefix)
+        chars = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            if len(keys[i]) == depth:
+                i += 1
+                continue
+            char = keys[i][depth]
+            chars.append(char)
+            i = bisect_left(keys, prefix + chr(ord(char) + 1), i)
+        return chars
+
+    def _one_typo_away(self, key: str, limit: int) -> List[str]:
+        # Shorter queries are one typo away from nearly everything.
+        if len(key) < 3:
+            return []
+        # An edit at position i keeps key[:i], so only positions up to the
+        # longest prefix of key that some name starts with can lead anywhere.
+        matched = 0
+        while matched < len(key) and self._has_prefix(key[:matched + 1]):
+            matched += 1
+        variants = []
+        for i in range(min(matched + 1, len(key))):
+            head, char, tail = key[:i], key[i], key[i + 1:]
+            if tail:
+                variants.append(head + tail[0] + char + tail[1:])
+            variants.append(head + tail)
+            for other in self._next_chars(head):
+                if other != char:
+                    variants.append(head + other + tail)
+                    variants.append(head + other + char + tail)
+        # Whole names one typo away rank before longer names starting with a variant.
+        matches = chain((variant for variant in variants if self._names_with_key(variant)),
+                        chain.from_iterable(self._keys_starting_with(variant, limit) for variant in variants))
+        results: List[str] = []
+        seen: Set[str] = set()
+        for match in matches:
+            if match not in seen and not match.startswith(key):
+                seen.add(match)
+                results.extend(self._names_with_key(match))
+                if len(results) >= limit:
+                    break
+        return results[:limit]
+
+    def _similar(self, key: str, limit: int) -> List[str]:
+        query = trigrams(key)
+        postings = sorted((self._postings(gram) for gram in query), key=len)
+        # A name needs at least this many shared trigrams to reach min_similarity,
+        # so it must appear in one of the rarest len(query) - min_shared + 1 postings.
+        min_shared = max(1, math.ceil(self.min_similarity * len(query) / (1 + self.min_similarity)))
+        shared: Counter = Counter()
+        for names in postings[:len(query) - min_shared + 1]:
+            if len(names) > self.max_postings:
+                break
+            shared.update(names)
+        # Typos in short names leave few trigrams intact, so the candidates
+        # sharing the most trigrams are also accepted within a small edit distance.
+        max_distance = max(1, len(key) // 4)
+        scored = []
+        for rank, (name, _) in enumerate(shared.most_common(self.max_candidates)):
+            count = sum(1 for names in postings if name in names)
+            similarity = count / (len(query) + self._gram_count(name) - count)
+            if similarity >= self.min_similarity or (
+                    rank < limit and _typo_distance(key, normalize_name(name)) <= max_distance):
+                scored.append((-similarity, name))
+        scored.sort()
+        return [name for _, name in scored[:limit]]
+
+    def _postings(self, gram: str) -> Collection[str]:
+        return self._trigrams.get(gram, ())
+
+    def _gram_count(self, name: str) -> int:
+        return self._gram_counts[name]
@@ -0,0 +1,189 @@
+import asyncio
+from typing import AsyncIterator, Callable, Optional
+from address_book import AddressBook
+from main import EXIT_COMMANDS, handle_action, parse_input, registry, strip_colors, suggester
+
+END_OF_RESPONSE = ".\n"
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+class ReadWriteLock:
+    """
+    Asyncio lock that admits many readers or a single writer.
+
+    Waiting writers block new readers, so a stream of reads cannot starve a write.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire_read(self) -> None:
+        if not self._writer and not self._writers_waiting:
+            self._readers += 1
+            return
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._writers_waiting)
+            self._readers += 1
+
+    async def release_read(self) -> None:
+        self._readers -= 1
+        if not self._readers and self._writers_waiting:
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def acquire_write(self) -> None:
+        async with self._condition:
+            self._writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+    async def release_write(self) -> None:
+        async with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class BookServer:
+    """
+    Serves an address book to many clients over TCP or a Unix socket.
+
+    Clients send one command per line in the same grammar as the interactive
+    bot. Each response is plain text followed by a line holding a single dot;
+    response lines that start with a dot get a second one, as in SMTP.
+    Requests on a connection are answered in order, so clients may pipeline
+    them without waiting for responses.
+
+    Handlers run on worker threads, so a long command does not hold up the
+    other connections. Read commands run concurrently, and a streamed listing
+    is produced chunk by chunk. Mutating commands wait for running reads and
+    run one at a time. Commands that read
+    or write files named by the client are refused, since they would act on
+    the server host with the server's permissions. Persistence is coalesced:
+    after writes, `commit` is called at most once per `commit_interval` seconds.
+
+    Attributes:
+        book (AddressBook): The served address book.
+    """
+
+    def __init__(self, book: AddressBook, commit: Optional[Callable[[], None]] = None,
+                 commit_interval: float = 0.05):
+        """
+        Args:
+            book (AddressBook): The address book to serve.
+            commit (Optional[Callable[[], None]]): Persists pending writes, if the storage needs it.
+            commit_interval (float): The minimum time in seconds between two commits.
+        """
+        self.book = book
+        self.commit = commit
+        self.commit_interval = commit_interval
+        self._lock = ReadWriteLock()
+        self._dirty = False
+        self._committer: Optional[asyncio.Task] = None
+
+    async def execute(self, line: str) -> AsyncIterator[str]:
+        """
+        Runs one command line and yields its plain-text response in chunks.
+
+        Args:
+            line (str): The command line.
+
+        Yields:
+            str: The response chunks, ending with the end-of-response marker.
+        """
+        action, args = parse_input(line)
+        command = registry.get(action)
+        suggested_command = suggester.suggest(action)
+        loop = asyncio.get_running_loop()
+        if suggested_command and suggested_command != action:
+            yield _frame(f"Unknown command '{action}'. Did you mean '{suggested_command}'?\n")
+        elif command is not None and command.uses_files:
+            yield _frame(f"The {action} command works with files and is not available in server mode.\n")
+        elif command is not None and command.mutates:
+            await self._lock.acquire_write()
+            try:
+                response = await loop.run_in_executor(None, handle_action, action, args, self.book)
+            finally:
+                await self._lock.release_write()
+            self._mark_dirty()
+            yield _frame(strip_colors(response).strip() + "\n")
+        else:
+            await self._lock.acquire_read()
+            try:
+                response = await loop.run_in_executor(None, handle_action, action, args, self.book)
+                if isinstance(response, str):
+                    yield _frame(strip_colors(response).strip() + "\n")
+                else:
+                    while (chunk := await loop.run_in_executor(None, next, response, None)) is not None:
+                        yield _frame(strip_colors(chunk), end=False)
+                    yield END_OF_RESPONSE
+            finally:
+                await self._lock.release_read()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers the commands of one client until it disconnects or sends an exit command.
+        """
+        try:
+            while line := await reader.readline():
+                user_input = line.decode("utf-8", errors="replace").strip()
+                if not user_input:
+                    continue
+                async for chunk in self.execute(user_input):
+                    writer.write(chunk.encode("utf-8"))
+                    await writer.drain()
+                if parse_input(user_input)[0] in EXIT_COMMANDS:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # The client went away, or the server is shutting down.
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str = DEFAULT_ADDRESS) -> None:
+        """
+        Listens on an address until cancelled, then commits pending writes.
+
+        Args:
+            address (str): "host:port" for TCP, or "unix:<path>" for a Unix socket.
+        """
+        if address.startswith("unix:"):
+            server = await asyncio.start_unix_server(self.handle_connection, address[len("unix:"):])
+        else:
+            host, _, port = address.rpartition(":")
+            server = await asyncio.start_server(self.handle_connection, host or None, int(port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self._committer is not None:
+                self._committer.cancel()
+            if self._dirty and self.commit is not None:
+                self.commit()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self.commit is not None and self._committer is None:
+            self._committer = asyncio.get_running_loop().create_task(self._commit_later())
+
+    async def _commit_later(self) -> None:
+        await asyncio.sleep(self.commit_interval)
+        # Reads may go on while the commit runs; writes wait for it.
+        await self._lock.acquire_read()
+        try:
+            self._committer = None
+            self._dirty = False
+            await asyncio.get_running_loop().run_in_executor(None, self.commit)
+        finally:
+            await self._lock.release_read()
+
+
+def _frame(text: str, end: bool = True) -> str:
+    if text.startswith(".") or "\n." in text:
+        text = "\n".join("." + line if line.startswith(".") else line for line in text.split("\n"))
+    return text + END_OF_RESPONSE if end else text
@@ -0,0 +1,497 @@
+import sqlite3
+import weakref
+from contextlib import contextmanager
+from datetime import date
+from collections.abc import MutableMapping, ValuesView
+from typing import Collection, Iterable, Iterator, List, Optional
+from address_book import AddressBook, birthday_bucket, window_buckets
+from birthday import Birthday
+from phone import Phone
+from record import Record
+from search import NameIndex, normalize_name, trigrams
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    birthday TEXT,
+    birthday_bucket INTEGER
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday_bucket ON contacts (birthday_bucket);
+CREATE TABLE IF NOT EXISTS phones (
+    name TEXT NOT NULL REFERENCES contacts (name) ON DELETE CASCADE,
+    phone TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phones_name ON phones (name, position);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+CREATE TABLE IF NOT EXISTS name_keys (
+    name TEXT PRIMARY KEY,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS name_keys_key ON name_keys (key);
+CREATE TABLE IF NOT EXISTS name_trigrams (
+    gram TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (gram, name)
+) WITHOUT ROWID;
+"""
+# Splits the keys of the given names into the trigrams of search.trigrams()
+# inside SQLite, and inserts them in key order so the B-tree fills front to back.
+INSERT_TRIGRAMS = """
+WITH RECURSIVE grams (name, padded, i) AS (
+    SELECT name, '  ' || key || ' ', 1 FROM name_keys WHERE name IN ({names})
+    UNION ALL
+    SELECT name, padded, i + 1 FROM grams WHERE i < length(padded) - 2
+)
+INSERT OR IGNORE INTO name_trigrams (gram, name) SELECT substr(padded, i, 3), name FROM grams ORDER BY 1, 2
+"""
+# PRAGMA user_version of databases whose name search tables are complete.
+NAMES_INDEXED = 1
+# Sorts after every character, so key < prefix + _MAX_CHAR bounds the keys starting with prefix.
+_MAX_CHAR = "\U0010ffff"
+
+
+class SQLiteRecords(MutableMapping):
+    """
+    Mapping of contact names to records, stored in SQLite.
+
+    Records are hydrated lazily on access and kept in a weak cache, so a record
+    that is still referenced is always returned as the same object.
+
+    Attributes:
+        db (sqlite3.Connection): The database connection.
+    """
+
+    def __init__(self, db: sqlite3.Connection, book: AddressBook):
+        self.db = db
+        self._book = weakref.ref(book)
+        self._cache = weakref.WeakValueDictionary()
+        self.deferred = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Runs statements in a transaction that is committed on exit, unless
+        commits are currently deferred.
+        """
+        if self.deferred:
+            yield
+        else:
+            with self.db:
+                yield
+
+    def __getitem__(self, name: str) -> Record:
+        record = self._cache.get(name)
+        if record is not None:
+            return record
+        row = self.db.execute("SELECT name, birthday FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        phones = [phone for phone, in self.db.execute(
+            "SELECT phone FROM phones WHERE name = ? ORDER BY position", (name,))]
+        return self._hydrate(row[0], phones, row[1])
+
+    def __setitem__(self, name: str, record: Record) -> None:
+        birthday = str(record.birthday) if record.birthday else None
+        bucket = birthday_bucket(record.birthday.value.month, record.birthday.value.day) if record.birthday else None
+        with self.transaction():
+            self.db.execute("DELETE FROM phones WHERE name = ?", (name,))
+            self.db.execute("INSERT OR REPLACE INTO contacts (name, birthday, birthday_bucket) VALUES (?, ?, ?)",
+                            (name, birthday, bucket))
+            self.db.executemany("INSERT INTO phones (name, phone, position) VALUES (?, ?, ?)",
+                                [(name, phone.value, position) for position, phone in enumerate(record.phones)])
+            self._index_names([name])
+        self._cache[name] = record
+
+    def bulk_insert(self, records: Iterable[Record]) -> None:
+        """
+        Inserts or replaces many records in a single transaction.
+
+        Args:
+            records (Iterable[Record]): The records to store.
+        """
+        contacts, phones = [], []
+        for record in records:
+            name = record.name.value
+            birthday = record.birthday
+            bucket = birthday_bucket(birthday.value.month, birthday.value.day) if birthday else None
+            contacts.append((name, str(birthday) if birthday else None, bucket))
+            phones.extend((name, phone.value, position) for position, phone in enumerate(record.phones))
+        with self.transaction():
+            self.db.executemany("DELETE FROM phones WHERE name = ?", [(contact[0],) for contact in contacts])
+            self.db.executemany("INSERT OR REPLACE INTO contacts (name, birthday, birthday_bucket) VALUES (?, ?, ?)",
+                                contacts)
+            self.db.executemany("INSERT INTO phones (name, phone, position) VALUES (?, ?, ?)", phones)
+            self._index_names(contact[0] for contact in contacts)
+
+    def index_names(self) -> None:
+        """
+        Fills the name search tables of a database created before they existed.
+
+        This runs once per database; afterwards the tables are kept up to date
+        with every write.
+        """
+        if self.db.execute("PRAGMA user_version").fetchone()[0] >= NAMES_INDEXED:
+            return
+        with self.transaction():
+            self._index_names([name for name, in self.db.execute("SELECT name FROM contacts")])
+            self.db.execute(f"PRAGMA user_version = {NAMES_INDEXED}")
+
+    def _index_names(self, names: Iterable[str]) -> None:
+        keys = [(name, normalize_name(name)) for name in names]
+        self.db.executemany("INSERT OR IGNORE INTO name_keys (name, key) VALUES (?, ?)", keys)
+        if len(keys) == 1:
+            name, key = keys[0]
+            self.db.executemany("INSERT OR IGNORE INTO name_trigrams (gram, name) VALUES (?, ?)",
+                                [(gram, name) for gram in trigrams(key)])
+            return
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS new_names (name TEXT PRIMARY KEY)")
+        self.db.executemany("INSERT OR IGNORE INTO new_names (name) VALUES (?)", [(name,) for name, _ in keys])
+        self.db.execute(INSERT_TRIGRAMS.format(names="SELECT name FROM new_names"))
+        self.db.execute("DELETE FROM new_names")
+
+    def __delitem__(self, name: str) -> None:
+        with self.transaction():
+            deleted = self.db.execute("DELETE FROM contacts WHERE name = ?", (name,)).rowcount
+            self.db.execute("DELETE FROM phones WHERE name = ?", (name,))
+            self.db.execute("DELETE FROM name_keys WHERE name = ?", (name,))
+            self.db.executemany("DELETE FROM name_trigrams WHERE gram = ? AND name = ?",
+                                [(gram, name) for gram in trigrams(normalize_name(name))])
+        if not deleted:
+            raise KeyError(name)
+        self._cache.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._cache:
+            return True
+        return self.db.execute("SELECT 1 FROM contacts WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for name, in self.db.execute("SELECT name FROM contacts ORDER BY rowid"):
+            yield name
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def select(self, where: str = "", params: tuple = ()) -> Iterator[Record]:
+        """
+        Streams records matching a WHERE clause using a single query.
+
+        Args:
+            where (str): An optional SQL condition on the contacts table.
+            params (tuple): The parameters of the condition.
+
+        Yields:
+            Record: The matching records in insertion order.
+        """
+        query = (
+            "SELECT c.name, c.birthday, p.phone FROM contacts c "
+            "LEFT JOIN phones p ON p.name = c.name "
+            f"{'WHERE ' + where if where else ''} ORDER BY c.rowid, p.position"
+        )
+        current, birthday, phones = None, None, []
+        for name, row_birthday, phone in self.db.execute(query, params):
+            if name != current:
+                if current is not None:
+                    yield self._cached_or_hydrate(current, phones, birthday)
+                current, birthday, phones = name, row_birthday, []
+            if phone is not None:
+                phones.append(phone)
+        if current is not None:
+            yield self._cached_or_hydrate(current, phones, birthday)
+
+    def _cached_or_hydrate(self, name: str, phones: List[str], birthday: Optional[str]) -> Record:
+        record = self._cache.get(name)
+        return record if record is not None else self._hydrate(name, phones, birthday)
+
+    def _hydrate(self, name: str, phones: List[str], birthday: Optional[str]) -> Record:
+        record = Record(name)
+        record.phones = [Phone(phone) for phone in phones]
+        if birthday:
+            record.birthday = Birthday(birthday)
+        record.book = self._book()
+        self._cache[name] = record
+        return record
+
+
+class SQLiteValues(ValuesView):
+    """
+    Values view that streams all records with one query instead of one per name.
+    """
+
+    def __iter__(self) -> Iterator[Record]:
+        return self._mapping.data.select()
+
+
+class _FrequentTrigram:
+    """
+    Posting list of a trigram shared by more than `max_postings` names,
+    which is only probed for single names instead of being loaded.
+    """
+
+    def __init__(self, db: sqlite3.Connection, gram: str, size: int):
+        self.db = db
+        self.gram = gram
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, name: object) -> bool:
+        return self.db.execute("SELECT 1 FROM name_trigrams WHERE gram = ? AND name = ?",
+                               (self.gram, name)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for name, in self.db.execute("SELECT name FROM name_trigrams WHERE gram = ?", (self.gram,)):
+            yield name
+
+
+class SQLiteNameIndex(NameIndex):
+    """
+    Name search over the name_keys and name_trigrams tables of a SQLite book.
+
+    The tables are written together with the contacts, so nothing is loaded
+    into memory up front and the index never needs rebuilding: each lookup
+    the matching makes is one indexed query.
+    """
+
+    def __init__(self, db: sqlite3.Connection, min_similarity: float = 0.3,
+                 max_postings: int = 1000, max_candidates: int = 50):
+        """
+        Args:
+            db (sqlite3.Connection): The database connection.
+            min_similarity (float): The lowest trigram similarity reported as a fuzzy match.
+            max_postings (int): Trigrams shared by more names than this do not propose candidates.
+            max_candidates (int): The number of trigram candidates scored per query.
+        """
+        self.db = db
+        self.min_similarity = min_similarity
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+
+    def add(self, name: str) -> None:
+        # SQLiteRecords writes the tables with the contact.
+        pass
+
+    def remove(self, name: str) -> None:
+        pass
+
+    def _names_with_key(self, key: str) -> List[str]:
+        return [name for name, in self.db.execute("SELECT name FROM name_keys WHERE key = ? ORDER BY name", (key,))]
+
+    def _keys_starting_with(self, prefix: str, limit: int) -> Iterator[str]:
+        rows = self.db.execute("SELECT DISTINCT key FROM name_keys WHERE key >= ? AND key < ? ORDER BY key LIMIT ?",
+                               (prefix, prefix + _MAX_CHAR, limit)).fetchall()
+        return (key for key, in rows)
+
+    def _has_prefix(self, prefix: str) -> bool:
+        return self.db.execute("SELECT 1 FROM name_keys WHERE key >= ? AND key < ? LIMIT 1",
+                               (prefix, prefix + _MAX_CHAR)).fetchone() is not None
+
+    def _next_chars(self, prefix: str) -> List[str]:
+        # One query per distinct next character, each skipping past the keys
+        # that continue with the previous one.
+        chars = []
+        bound = prefix
+        while row := self.db.execute("SELECT key FROM name_keys WHERE key > ? AND key < ? ORDER BY key LIMIT 1",
+                                     (bound, prefix + _MAX_CHAR)).fetchone():
+            char = row[0][len(prefix)]
+            chars.append(char)
+            bound = prefix + char + _MAX_CHAR
+        return chars
+
+    def _postings(self, gram: str) -> Collection[str]:
+        names = {name for name, in self.db.execute("SELECT name FROM name_trigrams WHERE gram = ? LIMIT ?",
+                                                   (gram, self.max_postings + 1))}
+        return names if len(names) <= self.max_postings else _FrequentTrigram(self.db, gram, len(names))
+
+    def _gram_count(self, name: str) -> int:
+        return len(trigrams(normalize_name(name)))
+
+
+class SQLiteAddressBook(AddressBook):
+    """
+    Address book stored in a local SQLite file.
+
+    Only the records that are touched are loaded into memory. Names, phones
+    and birthday buckets are indexed in the database, and every edit made
+    through the book or its records is written through immediately.
+
+    Attributes:
+        filename (str): The database filename.
+    """
+
+    def __init__(self, filename: str = "addressbook.db"):
+        """
+        Opens (and if needed creates) the database.
+
+        Args:
+            filename (str): The database filename.
+        """
+        super().__init__()
+        self.filename = filename
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < NAMES_INDEXED and \
+                self.db.execute("SELECT 1 FROM contacts LIMIT 1").fetchone() is None:
+            # A new database: its name search tables are complete from the first write.
+            self.db.execute(f"PRAGMA user_version = {NAMES_INDEXED}")
+        self.data = SQLiteRecords(self.db, self)
+
+    def __getstate__(self) -> dict:
+        raise TypeError("SQLiteAddressBook is stored in its database and cannot be pickled")
+
+    def values(self) -> SQLiteValues:
+        return SQLiteValues(self)
+
+    def index_names(self, background: bool = False) -> None:
+        """
+        Prepares search(), which queries indexed tables in the database instead
+        of holding every name in memory.
+
+        The tables are written with every contact, so there is nothing to build
+        ahead of the first search and a background build does nothing. Only a
+        database created before the tables existed is filled, once, on the
+        first search.
+
+        Args:
+            background (bool): Whether the call only warms up the index at startup.
+        """
+        if background or self._name_index is not None:
+            return
+        self.data.index_names()
+        self._name_index = SQLiteNameIndex(self.db)
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self.db.close()
+
+    @contextmanager
+    def deferred_commit(self) -> Iterator[None]:
+        """
+        Collects all writes made inside the block into a single commit.
+        """
+        self.data.deferred = True
+        try:
+            yield
+        finally:
+            self.data.deferred = False
+            self.db.commit()
+
+    def get_upcoming_birthdays(self, days: int = 7, today: Optional[date] = None) -> List[Record]:
+        """
+        Gets contacts with upcoming birthdays within the next `days` days.
+
+        Args:
+            days (int): The size of the window in days, today included.
+            today (Optional[date]): The first day of the window, date.today() by default.
+
+        Returns:
+            List[Record]: A list of records with upcoming birthdays, in date order.
+        """
+        buckets = window_buckets(days, today)
+        order = {bucket: position for position, bucket in enumerate(buckets)}
+        placeholders = ", ".join("?" * len(buckets))
+        records = self.data.select(f"c.birthday_bucket IN ({placeholders})", tuple(buckets))
+        return sorted(records, key=lambda record: order[
+            birthday_bucket(record.birthday.value.month, record.birthday.value.day)])
+
+    def find_by_phone(self, phone: str) -> List[Record]:
+        """
+        Finds the records that contain a phone number using the phone index.
+
+        Args:
+            phone (str): The phone number to look up.
+
+        Returns:
+            List[Record]: The records holding the number, empty if nobody has it.
+        """
+        return list(self.data.select("c.name IN (SELECT name FROM phones WHERE phone = ?)", (phone,)))
+
+    def _index_birthday(self, record: Record) -> None:
+        birthday = record.birthday
+        bucket = birthday_bucket(birthday.value.month, birthday.value.day) if birthday else None
+        with self.data.transaction():
+            self.db.execute("UPDATE contacts SET birthday = ?, birthday_bucket = ? WHERE name = ?",
+                            (str(birthday) if birthday else None, bucket, record.name.value))
+
+    def _unindex_birthday(self, record: Record, birthday) -> None:
+        pass
+
+    def _index_phone(self, name: str, phone: str) -> None:
+        pass
+
+    def _unindex_phone(self, name: str, phone: str) -> None:
+        pass
+
+    def _phone_added(self, record: Record, phone: str) -> None:
+        with self.data.transaction():
+            self.db.execute("INSERT INTO phones (name, phone, position) VALUES (?, ?, ?)",
+                            (record.name.value, phone, len(record.phones) - 1))
+        super()._phone_added(record, phone)
+
+    def _phone_removed(self, record: Record, phone: str) -> None:
+        self._rewrite_phones(record)
+        super()._phone_removed(record, phone)
+
+    def _phone_edited(self, record: Record, old_phone: str, new_phone: str) -> None:
+        self._rewrite_phones(record)
+        super()._phone_edited(record, old_phone, new_phone)
+
+    def _rewrite_phones(self, record: Record) -> None:
+        name = record.name.value
+        with self.data.transaction():
+            self.db.execute("DELETE FROM phones WHERE name = ?", (name,))
+            self.db.executemany("INSERT INTO phones (name, phone, position) VALUES (?, ?, ?)",
+                                [(name, phone.value, position) for position, phone in enumerate(record.phones)])
+
+    def _rebuild_indexes(self) -> None:
+        pass
+
+
+def migrate(source: str = "addressbook.pkl", target: str = "addressbook.db") -> int:
+    """
+    Imports a pickled address book into a SQLite database.
+
+    The journal left next to the pickle by a session that did not close
+    cleanly is replayed first, so its edits are migrated too.
+
+    Args:
+        source (str): The pickle filename.
+        target (str): The database filename.
+
+    Returns:
+        int: The number of imported contacts.
+    """
+    import pickle
+    from journal import replay
+    with open(source, "rb") as f:
+        book = pickle.load(f)
+    replay(book, source)
+    sqlite_book = SQLiteAddressBook(target)
+    try:
+        sqlite_book.data.bulk_insert(book.data.values())
+        return len(book)
+    finally:
+        sqlite_book.close()
+
+
+def main() -> None:
+    """
+    Command-line entry point for migrating a pickled book to SQLite.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Import addressbook.pkl into a SQLite address book.")
+    parser.add_argument("source", nargs="?", default="addressbook.pkl", help="pickled address book")
+    parser.add_argument("target", nargs="?", default="addressbook.db", help="SQLite database to create or update")
+    args = parser.parse_args()
+    count = migrate(args.source, args.target)
+    print(f"Imported {count} contacts into {args.target}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
-import difflib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 
 TRANS_CYRILLIC_TO_LATIN = {
-    
+
     'й': 'q', 'ц': 'w', 'у': 'e', 'к': 'r', 'е': 't', 'н': 'y', 'г': 'u', 'ш': 'i',
     'щ': 'o', 'з': 'p', 'ф': 'a', 'і': 's', 'в': 'd', 'а': 'f', 'п': 'g', 'р': 'h',
     'о': 'j', 'л': 'k', 'д': 'l', 'я': 'z', 'ч': 'x', 'с': 'c', 'м': 'v', 'и': 'b',
     'т': 'n', 'ь': 'm'
 }
 
+TRANSLATION_TABLE = str.maketrans(TRANS_CYRILLIC_TO_LATIN)
+
 def transliterate(text: str) -> str:
     """
     Transliterates Cyrillic text to Latin text.
@@ -18,7 +21,98 @@ def transliterate(text: str) -> str:
     Returns:
         str: The transliterated text.
     """
-    return ''.join(TRANS_CYRILLIC_TO_LATIN.get(char, char) for char in text)
+    return text.translate(TRANSLATION_TABLE)
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Computes the Levenshtein distance between two strings.
+
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+
+    Returns:
+        int: The number of single-character edits turning a into b.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+class CommandSuggester:
+    """
+    Suggests commands for mistyped input.
+
+    The command set is indexed once in a BK-tree, so a lookup only measures
+    the edit distance to the commands the triangle inequality cannot rule
+    out. Exact matches skip fuzzy matching, and recent inputs are cached.
+
+    Attributes:
+        commands (Tuple[str, ...]): The known commands, in preference order.
+    """
+
+    def __init__(self, commands: Iterable[str], cache_size: int = 1024):
+        """
+        Builds the BK-tree over the commands.
+
+        Args:
+            commands (Iterable[str]): The known commands, in preference order.
+            cache_size (int): The number of recent inputs to remember.
+        """
+        self.commands = tuple(dict.fromkeys(commands))
+        self._command_set = frozenset(self.commands)
+        self._rank = {command: i for i, command in enumerate(self.commands)}
+        self._tree: Optional[Tuple[str, Dict[int, tuple]]] = None
+        for command in self.commands:
+            self._insert(command)
+        self.suggest = lru_cache(maxsize=cache_size)(self._suggest)
+
+    def _insert(self, command: str) -> None:
+        if self._tree is None:
+            self._tree = (command, {})
+            return
+        node = self._tree
+        while True:
+            word, children = node
+            distance = edit_distance(command, word)
+            if distance in children:
+                node = children[distance]
+            else:
+                children[distance] = (command, {})
+                return
+
+    def _within(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        matches = []
+        stack = [self._tree] if self._tree else []
+        while stack:
+            word, children = stack.pop()
+            distance = edit_distance(query, word)
+            if distance <= max_distance:
+                matches.append((distance, word))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return matches
+
+    def _suggest(self, user_input: str) -> str:
+        if user_input in self._command_set:
+            return user_input
+        query = transliterate(user_input)
+        if query in self._command_set:
+            return query
+        matches = self._within(query, max(2, len(query) // 2))
+        if not matches:
+            return ""
+        return min(matches, key=lambda match: (match[0], self._rank[match[1]]))[1]
+
+@lru_cache(maxsize=16)
+def _suggester(commands: Tuple[str, ...]) -> CommandSuggester:
+    return CommandSuggester(commands)
 
 def suggest_command(user_input: str, commands: list[str]) -> str:
     """
@@ -31,11 +125,4 @@ def suggest_command(user_input: str, commands: list[str]) -> str:
     Returns:
         str: The suggested command or '' if no close match is found.
     """
-    
-    user_input_transliterated = transliterate(user_input)
-    closest_matches = difflib.get_close_matches(user_input_transliterated, commands, n=1, cutoff=0.1)
-    
-    
-    if closest_matches:
-        return closest_matches[0]
-    return ""
\ No newline at end of file
+    return _suggester(tuple(commands)).suggest(user_input)
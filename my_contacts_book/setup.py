@@ -8,7 +8,11 @@ setup(
     author='Oksana Donchuk',
     author_email='ksunya.donchuk@gmail.com',
     packages=find_packages(include=['my_contacts_book', 'my_contacts_book.*']),
-    entry_points={'console_scripts': ['my_contacts_book=my_contacts_book.main:main']},
+    entry_points={'console_scripts': [
+        'my_contacts_book=my_contacts_book.main:main',
+        'my_contacts_book_migrate=my_contacts_book.sqlite_book:main',
+        'my_contacts_book_snapshot=my_contacts_book.mmap_book:main',
+    ]},
     python_requires='>=3.6',
     classifiers=[
         'Programming Language :: Python :: 3',
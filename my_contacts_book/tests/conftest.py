@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The package modules import each other by their flat names, as they do when
+# the bot runs from its own directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "my_contacts_book"))
@@ -0,0 +1,118 @@
+import random
+from datetime import date, timedelta
+import pytest
+from address_book import AddressBook, congratulation_date, next_birthday
+from record import Record
+
+
+def add(book: AddressBook, name: str, birthday: str) -> None:
+    record = Record(name)
+    record.add_birthday(birthday)
+    book.add_record(record)
+
+
+def congratulations(book: AddressBook, days: int, today: date, limit=None):
+    return [(day.isoformat(), record.name.value)
+            for day, record in book.upcoming_congratulations(days, today, limit)]
+
+
+def test_weekend_birthdays_are_congratulated_on_monday_by_name():
+    book = AddressBook()
+    add(book, "Zed", "17.10.1990")
+    add(book, "Bob", "18.10.1985")
+    add(book, "Carl", "19.10.2000")
+    add(book, "Yan", "16.10.1970")
+    add(book, "Dan", "25.10.1970")
+
+    today = date(2026, 10, 15)
+    assert congratulations(book, 7, today) == [
+        ("2026-10-16", "Yan"), ("2026-10-19", "Bob"), ("2026-10-19", "Carl"), ("2026-10-19", "Zed"),
+    ]
+    assert congratulations(book, 7, today, limit=2) == [("2026-10-16", "Yan"), ("2026-10-19", "Bob")]
+
+
+def test_window_wraps_across_the_new_year():
+    book = AddressBook()
+    add(book, "Ann", "02.01.1990")
+    add(book, "Eve", "31.12.1990")
+    add(book, "Amy", "03.01.1990")
+
+    assert congratulations(book, 7, date(2026, 12, 30)) == [
+        ("2026-12-31", "Eve"), ("2027-01-04", "Amy"), ("2027-01-04", "Ann"),
+    ]
+
+
+@pytest.mark.parametrize("today", [date(2026, 10, 15), date(2027, 2, 26), date(2028, 2, 26), date(2026, 12, 28)])
+def test_congratulations_match_a_full_sort(today):
+    rng = random.Random(today.toordinal())
+    book = AddressBook()
+    for i in range(2000):
+        birthday = date(1980, 1, 1) + timedelta(days=rng.randrange(366 * 4))
+        add(book, f"Contact{i}", birthday.strftime("%d.%m.%Y"))
+
+    for days in (0, 7, 30, 366):
+        expected = sorted((congratulation_date(next_birthday(record.birthday.value, today)), record.name.value)
+                          for record in book.get_upcoming_birthdays(days, today))
+        expected = [(day.isoformat(), name) for day, name in expected]
+        assert congratulations(book, days, today) == expected
+        assert congratulations(book, days, today, limit=10) == expected[:10]
+
+
+def test_replaced_and_deleted_records_leave_the_book():
+    book = AddressBook()
+    old = Record("Alice")
+    old.add_phone("1111111111")
+    book.add_record(old)
+    new = Record("Alice")
+    new.add_phone("2222222222")
+    book["Alice"] = new
+    gone = Record("Bob")
+    gone.add_phone("3333333333")
+    book.add_record(gone)
+    del book["Bob"]
+
+    assert old.book is None and gone.book is None and new.book is book
+    # Edits of records that left the book no longer reach its indexes.
+    old.add_phone("4444444444")
+    gone.add_phone("5555555555")
+    assert book.find_by_phone("1111111111") == []
+    assert book.find_by_phone("4444444444") == []
+    assert book.find_by_phone("5555555555") == []
+    assert book.find_by_phone("2222222222") == [new]
+
+    book["Alice"] = new
+    assert new.book is book
+    assert book.find_by_phone("2222222222") == [new]
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_phone_index_follows_edits(thread_safe):
+    rng = random.Random(5)
+    book = AddressBook()
+    if thread_safe:
+        book.make_thread_safe()
+    phones = [f"05000000{i:02d}" for i in range(12)]
+    names = [f"Contact{i}" for i in range(8)]
+    for _ in range(2000):
+        name, phone, other = rng.choice(names), rng.choice(phones), rng.choice(phones)
+        record = book.find(name)
+        operation = rng.randrange(6)
+        if record is None or operation == 0:
+            replacement = Record(name)
+            replacement.add_phone(phone)
+            book[name] = replacement
+        elif operation == 1:
+            record.add_phone(phone)
+        elif operation == 2:
+            record.remove_phone(rng.choice(record.phones).value if record.phones else phone)
+        elif operation == 3:
+            record.edit_phone(rng.choice(record.phones).value if record.phones else phone, other)
+        elif operation == 4:
+            book.delete(name)
+        else:
+            record.add_birthday("01.01.2000")
+
+        for number in phones:
+            expected = sorted(name for name, record in book.items()
+                              if any(p.value == number for p in record.phones))
+            assert sorted(record.name.value for record in book.find_by_phone(number)) == expected
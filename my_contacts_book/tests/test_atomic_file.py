@@ -0,0 +1,30 @@
+import os
+import stat
+from atomic_file import atomic_write
+
+
+def mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_gets_the_umask_default(tmp_path):
+    path = str(tmp_path / "addressbook.pkl")
+    umask = os.umask(0)
+    os.umask(umask)
+    atomic_write(path, b"data")
+    with open(path, "rb") as f:
+        assert f.read() == b"data"
+    assert mode(path) == 0o666 & ~umask
+
+
+def test_replaced_file_keeps_its_mode(tmp_path):
+    path = str(tmp_path / "addressbook.pkl")
+    for permissions in (0o644, 0o640):
+        with open(path, "wb") as f:
+            f.write(b"old")
+        os.chmod(path, permissions)
+        atomic_write(path, b"new")
+        with open(path, "rb") as f:
+            assert f.read() == b"new"
+        assert mode(path) == permissions
+    assert os.listdir(tmp_path) == ["addressbook.pkl"]
@@ -0,0 +1,37 @@
+from datetime import date, datetime
+import pytest
+from birthday import Birthday, parse_birthday
+
+# Both the cached entry point and the parser behind the cache.
+PARSERS = [parse_birthday, parse_birthday.__wrapped__]
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+@pytest.mark.parametrize("value, expected", [
+    ("15.06.1990", date(1990, 6, 15)),
+    ("1.1.2000", date(2000, 1, 1)),
+    ("29.02.2000", date(2000, 2, 29)),
+])
+def test_parses_like_strptime(parse, value, expected):
+    assert parse(value) == expected == datetime.strptime(value, "%d.%m.%Y").date()
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+@pytest.mark.parametrize("value", ["01.01.200", "1.1.20000", "31.02.2000", "29.02.1900", "1.13.2000",
+                                   "01-01-2000", "aa.bb.cccc", "", "1..2000"])
+def test_rejects_what_strptime_rejects(parse, value):
+    with pytest.raises(ValueError):
+        datetime.strptime(value, "%d.%m.%Y")
+    with pytest.raises(ValueError):
+        parse(value)
+
+
+@pytest.mark.parametrize("value, shown", [
+    ("5.3.1999", "05.03.1999"),
+    ("1.12.2000", "01.12.2000"),
+    ("15.06.1990", "15.06.1990"),
+])
+def test_birthdays_are_shown_zero_padded(value, shown):
+    birthday = Birthday(value)
+    assert str(birthday) == shown
+    assert str(Birthday(str(birthday))) == shown
@@ -0,0 +1,40 @@
+import pytest
+from address_book import AddressBook
+from main import registry, strip_colors, suggester
+
+
+@pytest.mark.parametrize("action, args, usage", [
+    ("add", ["Alice"], "add <name> <phone> [birthday]"),
+    ("add", ["Alice", "1234567890", "01.01.2000", "extra"], "add <name> <phone> [birthday]"),
+    ("change", ["Alice"], "change <name> <old_phone> [new_phone]"),
+    ("phone", [], "phone <name>"),
+    ("delete", ["Alice", "Bob"], "delete <name>"),
+])
+def test_wrong_argument_counts_print_the_usage(action, args, usage):
+    book = AddressBook()
+    assert strip_colors(registry.dispatch(action, args, book)) == f"Error: Usage: {usage}"
+    assert len(book) == 0
+
+
+def test_every_usage_lists_the_required_arguments():
+    for command in registry:
+        required = [word for word in command.usage.split() if word.startswith("<")]
+        assert command.min_args == len(required), command.usage
+
+
+def test_accepted_counts_reach_the_handler():
+    book = AddressBook()
+    assert "Contact added." in registry.dispatch("add", ["Alice", "1234567890", "01.01.2000"], book)
+    assert str(book.find("Alice").birthday) == "01.01.2000"
+    assert registry.dispatch("unknown", [], book).startswith("Invalid command.")
+
+
+@pytest.mark.parametrize("typed, expected", [
+    ("add", "add"),
+    ("ad", "add"),
+    ("phnoe", "phone"),
+    ("фвв", "add"),
+    ("qwertyuiop", ""),
+])
+def test_suggester(typed, expected):
+    assert suggester.suggest(typed) == expected
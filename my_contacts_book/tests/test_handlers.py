@@ -0,0 +1,47 @@
+from address_book import AddressBook
+from handlers import dedupe_contacts, export_file, import_file
+from record import Record
+
+
+def test_import_reports_unreadable_files(tmp_path):
+    book = AddressBook()
+    malformed = tmp_path / "huge.csv"
+    # A field over the csv module's size limit makes the reader raise csv.Error.
+    malformed.write_text("Name,Phones\n" + "A" * 200_000 + ",0501234567\n", encoding="utf-8")
+    binary = tmp_path / "binary.csv"
+    binary.write_bytes(b"Name,Phones\n\xff\xfe\n")
+
+    for path in (malformed, binary, tmp_path):
+        response = import_file([str(path)], book)
+        assert f"Error: Cannot import {path}" in response
+    assert "File not found." in import_file([str(tmp_path / "missing.csv")], book)
+
+
+def test_export_reports_unwritable_paths(tmp_path):
+    response = export_file([str(tmp_path)], AddressBook())
+    assert f"Error: Cannot export {tmp_path}" in response
+
+
+def dedupe_book() -> AddressBook:
+    book = AddressBook()
+    for name, phone in [("Alice Smith", "1234567890"), ("Mom", "5550001111"), ("smith alice", "0987654321"),
+                        ("Dad", "5550001111")]:
+        record = Record(name)
+        record.add_phone(phone)
+        book.add_record(record)
+    return book
+
+
+def test_dedupe_merge_only_merges_matching_names_by_default():
+    book = dedupe_book()
+    response = dedupe_contacts(["merge"], book)
+    assert "Merged 1 groups." in response
+    assert "dedupe merge 2" in response
+    assert sorted(book) == ["Alice Smith", "Dad", "Mom"]
+    assert [phone.value for phone in book.find("Alice Smith").phones] == ["1234567890", "0987654321"]
+
+
+def test_dedupe_merge_merges_phone_groups_when_listed():
+    book = dedupe_book()
+    assert "Merged 1 groups." in dedupe_contacts(["merge", "2"], book)
+    assert sorted(book) == ["Alice Smith", "Mom", "smith alice"]
@@ -0,0 +1,68 @@
+from address_book import AddressBook
+from history import History
+from record import Record
+
+
+def state(book: AddressBook) -> dict:
+    return {name: ([phone.value for phone in record.phones], str(record.birthday) if record.birthday else None)
+            for name, record in book.items()}
+
+
+def make_book() -> AddressBook:
+    book = AddressBook()
+    for name, phone in (("Alice", "1111111111"), ("Bob", "2222222222")):
+        record = Record(name)
+        record.add_phone(phone)
+        book.add_record(record)
+    return book
+
+
+def test_undo_and_redo_round_trip_every_kind_of_change():
+    book = make_book()
+    history = History(book)
+    states = [state(book)]
+    steps = [
+        ("add Carol", lambda: book.add_record(Record("Carol"))),
+        ("change Alice", lambda: book.find("Alice").edit_phone("1111111111", "3333333333")),
+        ("add-birthday Bob", lambda: book.find("Bob").add_birthday("01.02.1990")),
+        ("phone Bob", lambda: book.find("Bob").add_phone("4444444444")),
+        ("delete Alice", lambda: book.delete("Alice")),
+    ]
+    for label, change in steps:
+        with history.step(label):
+            change()
+        states.append(state(book))
+    final = states[-1]
+
+    for label, _ in reversed(steps):
+        assert history.undo() == label
+        states.pop()
+        assert state(book) == states[-1]
+    assert history.undo() is None
+
+    for label, _ in steps:
+        assert history.redo() == label
+    assert history.redo() is None
+    assert state(book) == final == {"Bob": (["2222222222", "4444444444"], "01.02.1990"), "Carol": ([], None)}
+    # The indexes follow the restored contacts.
+    assert book.find_by_phone("3333333333") == []
+    assert [record.name.value for record in book.find_by_phone("4444444444")] == ["Bob"]
+
+
+def test_a_step_undoes_all_its_changes_and_new_changes_drop_redo():
+    book = make_book()
+    history = History(book)
+    before = state(book)
+    with history.step("merge"):
+        book.find("Alice").add_phone("2222222222")
+        book.delete("Bob")
+    with history.step("nothing"):
+        book.find("Alice").remove_phone("9999999999")
+
+    assert history.undo() == "merge"
+    assert state(book) == before
+    with history.step("add Dan"):
+        book.add_record(Record("Dan"))
+    assert history.redo() is None
+    assert history.undo() == "add Dan"
+    assert state(book) == before
@@ -0,0 +1,111 @@
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from address_book import AddressBook
+from autosave import Autosaver
+from journal import Journal, pickle_snapshot
+from main import load_data
+from mmap_book import write_snapshot
+from record import Record
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "my_contacts_book")
+
+# Edits a book through the interactive-mode storage path, waits for the
+# journal to reach the disk and kills the process without closing anything.
+SESSION = """
+import os, signal, sys
+sys.path.insert(0, {package_dir!r})
+from main import open_book
+from record import Record
+book, journal = open_book()
+journal.compact_every = {compact_every}
+for i in range({count}):
+    record = Record(f"Contact{{i}}")
+    record.add_phone(f"{{i:010d}}")
+    book.add_record(record)
+book.find("Contact0").add_birthday("01.02.2000")
+book.delete("Contact1")
+journal.commit()
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+
+def add(book: AddressBook, name: str, phone: str) -> Record:
+    record = Record(name)
+    record.add_phone(phone)
+    book.add_record(record)
+    return record
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+@pytest.mark.parametrize("filename, compact_every", [
+    ("addressbook.pkl", 10000),
+    ("addressbook.pkl", 50),
+    ("addressbook.mcb", 50),
+])
+def test_replay_recovers_edits_of_a_killed_session(tmp_path, filename, compact_every):
+    if filename.endswith(".mcb"):
+        write_snapshot(AddressBook(), str(tmp_path / filename))
+    count = 300
+    session = SESSION.format(package_dir=PACKAGE_DIR, compact_every=compact_every, count=count)
+    result = subprocess.run([sys.executable, "-c", session], cwd=tmp_path, capture_output=True)
+    assert result.returncode == -signal.SIGKILL, result.stderr.decode()
+
+    book = load_data(str(tmp_path / filename))
+    try:
+        assert len(book) == count - 1
+        assert book.find("Contact1") is None
+        assert str(book.find("Contact0").birthday) == "01.02.2000"
+        assert [phone.value for phone in book.find(f"Contact{count - 1}").phones] == [f"{count - 1:010d}"]
+    finally:
+        if hasattr(book, "close"):
+            book.close()
+
+
+def test_compaction_serializes_in_the_background(tmp_path):
+    filename = str(tmp_path / "addressbook.pkl")
+    book = AddressBook()
+    edited = threading.Event()
+    dumped = []
+
+    def dump(snapshot: AddressBook) -> bytes:
+        assert edited.wait(2)
+        dumped.append([phone.value for phone in snapshot.find("Alice").phones])
+        return pickle_snapshot(snapshot)
+
+    journal = Journal(book, filename, dump=dump)
+    add(book, "Alice", "1234567890")
+    journal.compact()
+    # compact() returned while the snapshot is still waiting to be serialized.
+    book.find("Alice").add_phone("0987654321")
+    edited.set()
+    journal.close()
+
+    assert dumped == [["1234567890"], ["1234567890", "0987654321"]]
+    with open(filename, "rb") as f:
+        saved = pickle.load(f)
+    assert [phone.value for phone in saved.find("Alice").phones] == ["1234567890", "0987654321"]
+    assert not os.path.exists(filename + ".journal")
+
+
+def test_autosaver_folds_the_journal_into_a_snapshot(tmp_path):
+    filename = str(tmp_path / "addressbook.pkl")
+    book = AddressBook()
+    journal = Journal(book, filename)
+    saver = Autosaver(book, lambda snapshot: journal.compact(), interval=0.05)
+    add(book, "Alice", "1234567890")
+    deadline = time.monotonic() + 2
+    while not os.path.exists(filename) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.path.exists(filename)
+    add(book, "Bob", "0987654321")
+    saver.close()
+    journal.close()
+
+    assert sorted(load_data(filename)) == ["Alice", "Bob"]
+    assert not os.path.exists(filename + ".journal")
@@ -0,0 +1,115 @@
+import threading
+import pytest
+from locking import RWLock
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    both_inside = threading.Barrier(2, timeout=5)
+
+    def read():
+        with lock.read():
+            both_inside.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not both_inside.broken
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = RWLock()
+    events = []
+    writing = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with lock.write():
+            writing.set()
+            release.wait(5)
+            events.append("write done")
+
+    def read():
+        with lock.read():
+            events.append("read")
+
+    def write_again():
+        with lock.write():
+            events.append("second write")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert writing.wait(5)
+    others = [threading.Thread(target=read), threading.Thread(target=write_again)]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(0.2)
+    assert events == []
+    release.set()
+    for thread in [writer] + others:
+        thread.join(5)
+    assert events[0] == "write done" and sorted(events[1:]) == ["read", "second write"]
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    events = []
+    reading = threading.Event()
+    release = threading.Event()
+
+    def first_reader():
+        with lock.read():
+            reading.set()
+            release.wait(5)
+            events.append("first read done")
+
+    def writer():
+        with lock.write():
+            events.append("write")
+
+    def late_reader():
+        with lock.read():
+            events.append("late read")
+
+    first = threading.Thread(target=first_reader)
+    first.start()
+    assert reading.wait(5)
+    waiting = threading.Thread(target=writer)
+    waiting.start()
+    while not lock._writers_waiting:
+        waiting.join(0.01)
+    late = threading.Thread(target=late_reader)
+    late.start()
+    late.join(0.2)
+    assert events == []
+    release.set()
+    for thread in (first, waiting, late):
+        thread.join(5)
+    assert events == ["first read done", "write", "late read"]
+
+
+def test_lock_is_reentrant_but_not_upgradable():
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                with lock.write():
+                    pass
+    # Both modes were released: another thread can write.
+    done = threading.Event()
+
+    def write():
+        with lock.write():
+            done.set()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join(5)
+    assert done.is_set()
@@ -0,0 +1,53 @@
+import io
+import main
+from address_book import AddressBook
+from main import batch_main, load_data, run_batch
+
+
+def test_batch_saves_once_at_the_end(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    saves = []
+    save_data = main.save_data
+    monkeypatch.setattr(main, "save_data", lambda book: saves.append(len(book)) or save_data(book))
+    script = tmp_path / "script.txt"
+    script.write_text("".join(f"add Contact{i} {i:010d}\n" for i in range(250)), encoding="utf-8")
+
+    batch_main(str(script))
+    assert saves == [250]
+    assert len(load_data()) == 250
+
+    script.write_text("phone Contact1\nall\n", encoding="utf-8")
+    batch_main(str(script))
+    assert saves == [250]
+
+
+def test_run_batch_skips_comments_and_stops_at_exit():
+    book = AddressBook()
+    out = io.StringIO()
+    lines = [
+        "# contacts to import\n",
+        "\n",
+        "ADD Alice 1234567890\n",
+        "   add   Bob   0987654321   01.02.1990  \n",
+        "add Carol\n",
+        "frobnicate\n",
+        "phone Alice\n",
+        "exit\n",
+        "add Dan 1112223333\n",
+    ]
+
+    stats = run_batch(lines, book, out)
+
+    assert sorted(book.data) == ["Alice", "Bob"]
+    assert str(book.find("Bob").birthday) == "01.02.1990"
+    assert (stats["commands"], stats["failures"]) == (5, 2)
+    report = out.getvalue().splitlines()
+    assert [line for line in report if line[:1].isdigit() and ": " in line] == [
+        "3: OK ADD Alice 1234567890",
+        "4: OK add   Bob   0987654321   01.02.1990",
+        "5: FAIL add Carol",
+        "6: FAIL frobnicate",
+        "7: OK phone Alice",
+    ]
+    assert "\x1b[" not in out.getvalue()
+    assert report[-1].startswith("5 commands, 2 failed, ")
@@ -0,0 +1,37 @@
+import json
+import pickle
+from address_book import AddressBook
+from journal import journal_paths
+from mmap_book import MmapAddressBook, convert
+from record import Record
+
+
+def test_convert_replays_the_pending_journal(tmp_path):
+    source = str(tmp_path / "addressbook.pkl")
+    target = str(tmp_path / "addressbook.mcb")
+    book = AddressBook()
+    record = Record("Alice")
+    record.add_phone("1234567890")
+    book.add_record(record)
+    with open(source, "wb") as f:
+        pickle.dump(book, f)
+    # Entries a crashed session left in both journals after the snapshot.
+    active, rotated = journal_paths(source)
+    with open(rotated, "w", encoding="utf-8") as f:
+        for entry in ([1, "add", "Bob", ["5555555555"], "01.02.2000"],
+                      [2, "add_phone", "Alice", "0987654321"]):
+            f.write(json.dumps(entry) + "\n")
+    with open(active, "w", encoding="utf-8") as f:
+        for entry in ([3, "delete", "Bob"],
+                      [4, "add", "Carol", ["1112223333"], "03.04.1990"]):
+            f.write(json.dumps(entry) + "\n")
+
+    assert convert(source, target) == 2
+
+    converted = MmapAddressBook(target)
+    try:
+        assert sorted(converted) == ["Alice", "Carol"]
+        assert [phone.value for phone in converted.find("Alice").phones] == ["1234567890", "0987654321"]
+        assert str(converted.find("Carol").birthday) == "03.04.1990"
+    finally:
+        converted.close()
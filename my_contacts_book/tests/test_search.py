@@ -0,0 +1,65 @@
+import threading
+import pytest
+from address_book import AddressBook
+from record import Record
+from search import NameIndex
+
+NAMES = ["Alice", "Alicia", "Alina", "Iryna", "Ivan", "Ivanna", "Olena", "Oleksandr", "Taras", "Alice Smith"]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(NAMES)
+
+
+def test_prefix_lists_the_exact_match_first(index):
+    assert index.prefix("ali") == ["Alice", "Alice Smith", "Alicia", "Alina"]
+    assert index.prefix("Ivan", limit=1) == ["Ivan"]
+    assert index.prefix("zed") == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("alcie", "Alice"),
+    ("Irnya", "Iryna"),
+    ("Ivn", "Ivan"),
+    ("Olnea", "Olena"),
+    ("Tarass", "Taras"),
+    ("Aliec Smtih", "Alice Smith"),
+    ("шмфт", "Ivan"),
+])
+def test_search_finds_typos(index, query, expected):
+    assert expected in index.search(query, limit=3)
+
+
+def test_removed_names_are_not_found(index):
+    index.remove("Iryna")
+    index.remove("Nobody")
+    index.add("Iryna Petrenko")
+    assert index.search("Irnya") == ["Iryna Petrenko"]
+    assert "Iryna" not in index.prefix("i")
+
+
+def add(book: AddressBook, name: str) -> None:
+    record = Record(name)
+    record.add_phone("1234567890")
+    book.add_record(record)
+
+
+def test_edits_during_a_background_build_reach_the_index(monkeypatch):
+    book = AddressBook().make_thread_safe()
+    for name in NAMES:
+        add(book, name)
+    release = threading.Event()
+    build = NameIndex.__init__
+
+    def slow_build(self, *args, **kwargs):
+        release.wait(2)
+        build(self, *args, **kwargs)
+
+    monkeypatch.setattr(NameIndex, "__init__", slow_build)
+    book.index_names(background=True)
+    add(book, "Bohdan")
+    book.delete("Taras")
+    release.set()
+    assert [record.name.value for record in book.search("Bogdan")] == ["Bohdan"]
+    assert book.search("Taras") == []
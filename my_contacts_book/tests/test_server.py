@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from address_book import AddressBook
+from main import registry
+from record import Record
+from server import BookServer
+
+
+async def run(server: BookServer, line: str) -> str:
+    return "".join([chunk async for chunk in server.execute(line)])
+
+
+def test_file_commands_are_refused(tmp_path):
+    book = AddressBook()
+    server = BookServer(book)
+    path = tmp_path / "contacts.csv"
+    path.write_text("Name,Phones\nAlice,1234567890\n", encoding="utf-8")
+
+    assert "not available in server mode" in asyncio.run(run(server, f"import {path}"))
+    assert "not available in server mode" in asyncio.run(run(server, f"export {tmp_path / 'out.csv'}"))
+    assert len(book) == 0
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_slow_handler_does_not_block_other_clients(monkeypatch):
+    book = AddressBook()
+    record = Record("Alice")
+    record.add_phone("1234567890")
+    book.add_record(record)
+    server = BookServer(book)
+    started = threading.Event()
+    show_phone = registry.get("phone").handler
+
+    def slow_phone(args, book):
+        started.set()
+        time.sleep(0.5)
+        return show_phone(args, book)
+
+    monkeypatch.setattr(registry.get("phone"), "handler", slow_phone)
+
+    async def clients():
+        slow = asyncio.create_task(run(server, "phone Alice"))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        quick = await asyncio.wait_for(run(server, "hello"), 0.3)
+        assert not slow.done()
+        return quick, await slow
+
+    quick, slow = asyncio.run(clients())
+    assert quick == "How can I help you?\n.\n"
+    assert "1234567890" in slow
@@ -0,0 +1,74 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+import pytest
+from address_book import AddressBook
+from record import Record
+from sharding import ShardedBook, born_in_month, phone_prefix
+
+
+def make_book(count: int) -> AddressBook:
+    rng = random.Random(count)
+    book = AddressBook()
+    for i in range(count):
+        record = Record(f"Contact{i}")
+        record.add_phone(f"0{rng.choice((50, 67, 93))}{rng.randrange(10 ** 7):07d}")
+        if rng.random() < 0.8:
+            birthday = date(1960, 1, 1) + timedelta(days=rng.randrange(366 * 40))
+            record.add_birthday(birthday.strftime("%d.%m.%Y"))
+        book.add_record(record)
+    return book
+
+
+def names(records) -> list:
+    return [record.name.value for record in records]
+
+
+@pytest.mark.parametrize("today", [date(2026, 10, 15), date(2026, 12, 28), date(2028, 2, 26)])
+def test_sharded_window_matches_the_birthday_index(today):
+    book = make_book(3000)
+    with ThreadPoolExecutor(2) as executor:
+        sharded = ShardedBook(book, shard_size=700, executor=executor)
+        assert sharded.sharded
+        for days in (0, 7, 30, 366):
+            assert names(sharded.upcoming_birthdays(days, today)) == names(book.get_upcoming_birthdays(days, today))
+
+
+def test_sharded_reports_match_a_scan():
+    book = make_book(3000)
+    with ThreadPoolExecutor(2) as executor:
+        sharded = ShardedBook(book, shard_size=700, executor=executor)
+        assert names(sharded.report(partial(born_in_month, 5))) == [
+            record.name.value for record in book.values()
+            if record.birthday and record.birthday.value.month == 5]
+        assert names(sharded.report(partial(phone_prefix, "067"))) == [
+            record.name.value for record in book.values() if record.phones[0].value.startswith("067")]
+
+
+def test_shards_go_stale_after_edits():
+    book = make_book(200)
+    today = date(2026, 10, 15)
+    with ThreadPoolExecutor(2) as executor:
+        sharded = ShardedBook(book, shard_size=50, executor=executor)
+        window = names(sharded.upcoming_birthdays(366, today))
+        removed = window[0]
+        book.delete(removed)
+        added = Record("Newcomer")
+        added.add_birthday(today.strftime("%d.%m.1990"))
+        book.add_record(added)
+
+        assert names(sharded.upcoming_birthdays(366, today)) == window[1:]
+        assert "Newcomer" in names(book.get_upcoming_birthdays(366, today))
+
+
+def test_small_books_are_answered_in_process():
+    book = make_book(200)
+    with ShardedBook(book, workers=4) as sharded:
+        assert not sharded.sharded and sharded.shards == []
+        book.add_record(Record("Newcomer"))
+        assert names(sharded.report(partial(born_in_month, 5))) == [
+            record.name.value for record in book.values()
+            if record.birthday and record.birthday.value.month == 5]
+        assert names(sharded.upcoming_birthdays(7, date(2026, 10, 15))) == \
+            names(book.get_upcoming_birthdays(7, date(2026, 10, 15)))
@@ -0,0 +1,84 @@
+import json
+import pickle
+import sqlite3
+import pytest
+from address_book import AddressBook
+from journal import journal_paths
+from record import Record
+from search import NameIndex
+from sqlite_book import SQLiteAddressBook, SQLiteNameIndex, migrate
+
+NAMES = ["Alice", "Alicia", "Alina", "Iryna", "Ivan", "Ivanna", "Olena", "Oleksandr", "Taras", "Alice Smith",
+         "Bohdan", "Alla", "Aliona", "Ivanka"]
+QUERIES = ["ali", "Ivan", "zed", "alcie", "Irnya", "Ivn", "Olnea", "Tarass", "Aliec Smtih", "шмфт", "Bogdan", "al"]
+
+
+def add(book: AddressBook, name: str) -> None:
+    record = Record(name)
+    record.add_phone("1234567890")
+    book.add_record(record)
+
+
+def test_migrate_replays_the_pending_journal(tmp_path):
+    source = str(tmp_path / "addressbook.pkl")
+    target = str(tmp_path / "addressbook.db")
+    book = AddressBook()
+    record = Record("Alice")
+    record.add_phone("1234567890")
+    book.add_record(record)
+    with open(source, "wb") as f:
+        pickle.dump(book, f)
+    # Entries a crashed session left in the journal after the snapshot.
+    active, _ = journal_paths(source)
+    with open(active, "w", encoding="utf-8") as f:
+        for entry in ([1, "add", "Bob", ["5555555555"], "01.02.2000"],
+                      [2, "add_phone", "Alice", "0987654321"],
+                      [3, "delete", "Bob"],
+                      [4, "add", "Carol", ["1112223333"], None]):
+            f.write(json.dumps(entry) + "\n")
+
+    assert migrate(source, target) == 2
+
+    migrated = SQLiteAddressBook(target)
+    try:
+        assert sorted(migrated) == ["Alice", "Carol"]
+        assert [phone.value for phone in migrated.find("Alice").phones] == ["1234567890", "0987654321"]
+    finally:
+        migrated.close()
+
+
+@pytest.mark.parametrize("max_postings", [1000, 2])
+def test_search_runs_in_sql_like_the_name_index(tmp_path, max_postings):
+    book = SQLiteAddressBook(str(tmp_path / "addressbook.db"))
+    try:
+        for name in NAMES:
+            add(book, name)
+        book.delete("Taras")
+        add(book, "Iryna Petrenko")
+        book.index_names(background=True)
+        book._name_index = SQLiteNameIndex(book.db, max_postings=max_postings)
+        names = [name for name in NAMES if name != "Taras"] + ["Iryna Petrenko"]
+        expected = NameIndex(names, max_postings=max_postings)
+        for query in QUERIES:
+            assert [record.name.value for record in book.search(query)] == expected.search(query), query
+    finally:
+        book.close()
+
+
+def test_search_tables_are_filled_once_for_older_databases(tmp_path):
+    filename = str(tmp_path / "addressbook.db")
+    book = SQLiteAddressBook(filename)
+    for name in NAMES:
+        add(book, name)
+    book.close()
+    # A database written before the name search tables existed.
+    db = sqlite3.connect(filename)
+    db.executescript("DELETE FROM name_keys; DELETE FROM name_trigrams; PRAGMA user_version = 0;")
+    db.close()
+
+    book = SQLiteAddressBook(filename)
+    try:
+        assert [record.name.value for record in book.search("alcie", limit=1)] == ["Alice"]
+        assert book.db.execute("SELECT COUNT(*) FROM name_keys").fetchone()[0] == len(NAMES)
+    finally:
+        book.close()